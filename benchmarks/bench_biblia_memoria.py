@@ -0,0 +1,70 @@
+"""
+Compara a memória ocupada e o tempo de carga da Bíblia como árvore de dicts
+(o JSON carregado), como `IndiceBiblia` compacto montado do JSON e como
+`IndiceBiblia` aberto do cache binário.
+
+Cada formato é medido num processo separado, para que o RSS de um não
+contamine o do outro.
+
+Uso: `python -m benchmarks.bench_biblia_memoria`
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from utils.biblia import IndiceBiblia, carregar_indice
+from utils.data import carregar_biblia
+
+def rss_kb() -> int:
+	"""RSS atual do processo em KiB (só no Linux; 0 nos outros sistemas)."""
+	try:
+		with open("/proc/self/statm") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+	except (OSError, ValueError):
+		return 0
+
+def medir(formato: str):
+	gc.collect()
+	rss_inicial = rss_kb()
+	if formato == "cache":
+		# Garante que o cache existe antes de medir.
+		carregar_indice()
+		gc.collect()
+		rss_inicial = rss_kb()
+
+	tracemalloc.start()
+	inicio = time.perf_counter()
+
+	if formato == "cache":
+		biblia = carregar_indice()
+	else:
+		biblia = carregar_biblia()
+		if formato == "compacto":
+			biblia = IndiceBiblia.do_json(biblia)
+
+	tempo = (time.perf_counter() - inicio) * 1000
+	gc.collect()
+
+	alocado, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(f"{formato} {alocado // 1024} {rss_kb() - rss_inicial} {tempo:.1f}")
+
+def main():
+	if len(sys.argv) > 1:
+		medir(sys.argv[1])
+		return
+
+	print(f"{'formato':<12}{'alocado':>14}{'RSS':>14}{'carga':>12}")
+	for formato in ("dicts", "compacto", "cache"):
+		saida = subprocess.run(
+			[sys.executable, "-m", "benchmarks.bench_biblia_memoria", formato],
+			capture_output=True, text=True, check=True
+		).stdout.splitlines()[-1].split()
+		print(f"{saida[0]:<12}{saida[1]:>11}KiB{saida[2]:>11}KiB{saida[3]:>10}ms")
+
+if __name__ == "__main__":
+	main()
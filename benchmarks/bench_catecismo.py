@@ -0,0 +1,111 @@
+"""
+Mede o tempo para extrair os parágrafos de cada página do Catecismo salva,
+comparando a extração antiga (`html.parser` com as substituições feitas uma a
+uma) com `extrair_paragrafos` em cada parser instalado.
+
+Por padrão usa as páginas guardadas em `data/cache_catecismo/` (basta o bot ter
+citado o Catecismo uma vez, ou rodar `python -m utils.catecismo construir`).
+Também dá para passar arquivos `.html` salvos do site do Vaticano:
+`python -m benchmarks.bench_catecismo [pagina.html ...]`
+"""
+
+import glob
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.catecismo import CACHE_PAGINAS, LexborHTMLParser, extrair_paragrafos, lxml
+from utils.data import abrir_json
+
+REPETICOES = 5
+
+def extrair_antigo(html: str) -> dict[int, str]:
+	"""Extração de antes, copiada de `baixar_e_extrair` para comparação."""
+	soup = BeautifulSoup(html, "html.parser")
+	paragrafos = {}
+
+	for p in soup.find_all("p"):
+		b = p.find("b")
+		if not b:
+			continue
+
+		numero = b.get_text(strip=True).replace(".", "")
+		if not numero.isdigit():
+			continue
+
+		b.extract()
+		texto = p.get_text(" ", strip=True)
+		texto = texto.lstrip(".-–—:; ")
+		texto = texto.replace("«", '"').replace("»", '"')
+
+		palavras = {
+			"secção": "seção",
+			"actor": "ator",
+			"actos": "atos"
+		}
+
+		palavras_variacoes = {}
+
+		for antiga, nova in palavras.items():
+			palavras_variacoes[antiga] = nova
+			palavras_variacoes[antiga.capitalize()] = nova.capitalize()
+			palavras_variacoes[antiga.upper()] = nova.upper()
+
+		for antiga, nova in palavras_variacoes.items():
+			texto = texto.replace(antiga, nova)
+
+		paragrafos[int(numero)] = texto
+
+	return paragrafos
+
+def carregar_paginas(arquivos: list[str]) -> dict[str, str]:
+	paginas = {}
+	if arquivos:
+		for arquivo in arquivos:
+			with open(arquivo, encoding="utf-8", errors="replace") as f:
+				paginas[os.path.basename(arquivo)] = f.read()
+		return paginas
+
+	for arquivo in sorted(glob.glob(os.path.join(CACHE_PAGINAS, "*.json"))):
+		entrada = abrir_json(arquivo)
+		if entrada.get("html"):
+			paginas[entrada["url"].split("/")[-1]] = entrada["html"]
+	return paginas
+
+def medir(extrair, html: str) -> float:
+	inicio = time.perf_counter()
+	for _ in range(REPETICOES):
+		extrair(html)
+	return (time.perf_counter() - inicio) / REPETICOES * 1000
+
+def main():
+	paginas = carregar_paginas(sys.argv[1:])
+	if not paginas:
+		print(f"[BENCH] Nenhuma página salva em {CACHE_PAGINAS}; passe arquivos .html como argumento.")
+		return
+
+	extratores = {"antigo": extrair_antigo, "html.parser": lambda html: extrair_paragrafos(html, "html.parser")}
+	if lxml is not None:
+		extratores["lxml"] = lambda html: extrair_paragrafos(html, "lxml")
+	if LexborHTMLParser is not None:
+		extratores["selectolax"] = lambda html: extrair_paragrafos(html, "selectolax")
+
+	totais = dict.fromkeys(extratores, 0.0)
+	print(f"{'página':<36}{'parágrafos':>11}" + "".join(f"{nome:>14}" for nome in extratores))
+	for nome, html in paginas.items():
+		esperado = extrair_antigo(html)
+		for parser, extrair in extratores.items():
+			if extrair(html) != esperado:
+				print(f"[BENCH] {parser} extraiu algo diferente em {nome}")
+
+		tempos = [medir(extrair, html) for extrair in extratores.values()]
+		for parser, tempo in zip(extratores, tempos):
+			totais[parser] += tempo
+		print(f"{nome:<36}{len(esperado):>11}" + "".join(f"{t:>12.2f}ms" for t in tempos))
+
+	print(f"{'média por página':<47}" + "".join(f"{t / len(paginas):>12.2f}ms" for t in totais.values()))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,43 @@
+"""
+Compara o tempo de leitura dos arquivos de `DataFiles` com o `json` padrão e
+com o `orjson` (quando instalado).
+
+Uso: `python -m benchmarks.bench_json [repeticoes]`
+"""
+
+import json
+import os
+import sys
+import time
+
+from utils.data import DataFiles, orjson
+
+def medir(carregar, bruto: bytes, repeticoes: int) -> float:
+	inicio = time.perf_counter()
+	for _ in range(repeticoes):
+		carregar(bruto)
+	return (time.perf_counter() - inicio) / repeticoes * 1000
+
+def main():
+	repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+	backends = {"json": json.loads}
+	if orjson is not None:
+		backends["orjson"] = orjson.loads
+	else:
+		print("[BENCH] orjson não instalado, medindo só o json padrão.")
+
+	print(f"{'arquivo':<25}{'tamanho':>12}" + "".join(f"{nome:>12}" for nome in backends))
+	for arquivo in DataFiles:
+		caminho = arquivo.value
+		if not caminho.endswith(".json") or not os.path.isfile(caminho):
+			continue
+
+		with open(caminho, "rb") as f:
+			bruto = f.read()
+
+		tempos = [medir(carregar, bruto, repeticoes) for carregar in backends.values()]
+		print(f"{caminho:<25}{len(bruto):>12}" + "".join(f"{t:>10.2f}ms" for t in tempos))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,138 @@
+"""
+Mede o custo por mensagem de achar referências bíblicas, comparando o parser
+antigo de `expand_bible_verse` (regex compilada a cada linha) com
+`encontrar_referencias` (linhas inteiras) e `encontrar_referencias_inline`
+(o que roda em cada mensagem do chat).
+
+O corpus abaixo imita o chat do servidor: a maioria das mensagens não tem
+referência nenhuma, e as que têm costumam citá-la no meio da frase. O cache
+de `resolver_livro` é limpo a cada repetição, para medir a busca dos nomes e
+não o cache. Também dá para passar um arquivo com uma mensagem por linha:
+`python -m benchmarks.bench_referencias [arquivo] [repeticoes]`
+"""
+
+import re
+import sys
+import time
+
+from utils.recursos import FIM_CAPITULO, LIVROS_MAP, encontrar_referencias, encontrar_referencias_inline, resolver_livro
+
+CORPUS = [
+	"bom dia a todos!",
+	"alguém sabe que horas começa a missa hoje?",
+	"a paz de Cristo irmãos",
+	"kkkkkkk",
+	"vou rezar o terço às 18h",
+	"Jo 3,16",
+	"amém",
+	"Mt 5,1-12",
+	"quem vai na adoração amanhã?",
+	"o padre falou muito bem no sermão de domingo",
+	"Sl 23,1-6; Is 53,5",
+	"eu li o capítulo 3 ontem",
+	"1Cor 13,4-7.13",
+	"São João 1,1-5",
+	"alguém tem o link do catecismo?",
+	"salve maria 🙏",
+	"Gn 1,1",
+	"tenho 2 perguntas sobre a crisma",
+	"Rm 8,28",
+	"boa noite, fiquem com Deus",
+	"leiam Jo 3,16 antes da missa",
+	"o evangelho de hoje é Mt 5,1-12, bem bonito",
+	"tomei os 2,5 litros de água",
+	"alguém explica 1 Cor 13,4-7 pra mim?",
+	"o padre citou Genesys 1,1 no sermão",
+	"chego em 1,5 hora",
+]
+
+def referencias_antigas(content: str) -> list[tuple]:
+	"""Parser de antes, copiado de `expand_bible_verse` para comparação."""
+	data = []
+
+	pattern = (
+		r"^((?:[1-3]\s?)?"
+		r"[A-Za-zÀ-ÿ]+"
+		r"(?:\s+[A-Za-zÀ-ÿ]+)*)"
+		r"\s*(\d+[,:\dab\.-]*)$"
+	)
+
+	def limpar_versiculo(v):
+		return int(re.match(r"\d+", v).group())
+
+	def parse_chapter_verses(text):
+		match = re.match(r"^(\d+)[,:](.+)$", text.strip())
+		if not match:
+			return []
+
+		capitulo = int(match.group(1))
+		ranges = []
+		for trecho in match.group(2).split("."):
+			trecho = trecho.strip()
+			if not trecho:
+				continue
+			if "-" in trecho:
+				a, b = trecho.split("-")
+				v1 = limpar_versiculo(a)
+				v2 = limpar_versiculo(b)
+			else:
+				v1 = v2 = limpar_versiculo(trecho)
+			ranges.append((capitulo, v1, v2))
+		return ranges
+
+	for bloco in content.split(";"):
+		for linha in bloco.splitlines():
+			linha = linha.strip()
+			if not linha:
+				continue
+
+			match = re.match(pattern, linha)
+			if not match:
+				continue
+
+			livro_input, cap_vers = match.groups()
+			livro_meta = LIVROS_MAP.get(livro_input.lower())
+			if not livro_meta:
+				continue
+
+			for cap, v1, v2 in parse_chapter_verses(cap_vers):
+				data.append((livro_meta, cap, min(v1, v2), max(v1, v2)))
+
+	return data
+
+def medir(funcao, corpus: list[str], repeticoes: int) -> float:
+	total = 0.0
+	for _ in range(repeticoes):
+		resolver_livro.cache_clear()
+		inicio = time.perf_counter()
+		for linha in corpus:
+			funcao(linha)
+		total += time.perf_counter() - inicio
+	return total / (repeticoes * len(corpus)) * 1_000_000
+
+def main():
+	corpus = CORPUS
+	if len(sys.argv) > 1:
+		with open(sys.argv[1], encoding="utf-8") as f:
+			corpus = [linha.rstrip("\n") for linha in f if linha.strip()]
+	repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+	for linha in corpus:
+		# O parser antigo só conhecia trechos dentro de um capítulo.
+		novas = [
+			(meta, c1, v1, v2) for meta, c1, v1, c2, v2 in encontrar_referencias(linha)
+			if c1 == c2 and v2 != FIM_CAPITULO
+		]
+		if referencias_antigas(linha) != novas:
+			print(f"[BENCH] Resultado diferente para: {linha!r}")
+
+	antes = medir(referencias_antigas, corpus, repeticoes)
+	depois = medir(encontrar_referencias, corpus, repeticoes)
+	inline = medir(encontrar_referencias_inline, corpus, repeticoes)
+	print(f"{len(corpus)} mensagens, {repeticoes} repetições")
+	print(f"antes:  {antes:.2f}µs por mensagem")
+	print(f"depois: {depois:.2f}µs por mensagem")
+	print(f"inline: {inline:.2f}µs por mensagem (chat)")
+
+if __name__ == "__main__":
+	main()
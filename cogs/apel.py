@@ -9,7 +9,7 @@ from enum import Enum
 from typing import TypedDict, Optional
 
 from utils.recursos import Bot
-from utils.data import get_member
+from utils.data import get_warns
 
 
 class LogEnum(Enum):
@@ -61,9 +61,7 @@ async def get_punicoes(user: discord.User, guild: discord.Guild) -> list[Punicao
 					"motivo": entry.reason or "Não informado"
 				})
 
-	user_data = get_member(user.id) or {"warns": []}
-
-	for w in user_data["warns"]:
+	for w in await get_warns(user.id):
 		punicoes.append({
 			"tipo": LogEnum.warnremove if w.get("remocao", False) else LogEnum.warn,
 			"author": w["dado_por"],
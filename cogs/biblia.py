@@ -1,14 +1,17 @@
+import asyncio
 import discord
-import random
 
 from discord import app_commands, ui
 from discord.ext import commands
 
-from utils.recursos import Bot, expand_bible_verse
-from utils.data import BibliaDict, carregar_biblia, TestamentoDict
+from utils.recursos import Bot, LIVROS_MAP
+from utils.biblia import get_biblia, get_busca
 
 from typing import Literal
 
+RESULTADOS_POR_PAGINA = 10
+TAMANHO_TRECHO_BUSCA = 300
+
 class BibliaCog(commands.Cog):
 	def __init__(self, bot: Bot):
 		self.bot = bot
@@ -19,36 +22,68 @@ class BibliaCog(commands.Cog):
 	)
 
 	@biblia_bp.command(name="aleatório", description="Escolha um versículo aleatório")
-	async def aleatorio(self, interaction: discord.Interaction):
-		biblia = carregar_biblia()
-		livros: list[TestamentoDict] = biblia[random.choice(list(biblia))]
-		livro = random.choice(livros)
-		nome = livro["nome"]
-		capitulos = livro["capitulos"]
-		capitulo = random.choice(capitulos)
-		versiculos = capitulo["versiculos"]
-		versiculo = random.choice(versiculos)["versiculo"]
-
-		resultados = expand_bible_verse(f"{nome} {capitulo['capitulo']},{versiculo}")
-		embeds = []
-
-		for res in resultados:
-			versiculo_inicial = res['versículo_inicial']
-			versiculo_final = res['versículo_final']
-			versiculo = versiculo_inicial if versiculo_inicial == versiculo_final else f"{versiculo_inicial}-{versiculo_final}"
-
-			tipo = res['tipo']
-
-			passagem = f"{res['capítulo']},{versiculo}"
-
-			embed = discord.Embed(
-				title=f"{res['livro']} {passagem} ({tipo})",
-				description=f"{res['texto']}",
-				colour=0xffcc00
-			)
-			embeds.append(embed)
+	@app_commands.choices(
+		testamento=[
+			app_commands.Choice(name="Antigo Testamento", value="antigoTestamento"),
+			app_commands.Choice(name="Novo Testamento", value="novoTestamento")
+		]
+	)
+	@app_commands.describe(
+		testamento="Sortear só deste testamento (padrão: a Bíblia inteira)"
+	)
+	async def aleatorio(self, interaction: discord.Interaction, testamento: app_commands.Choice[str] = None):
+		biblia = get_biblia()
+		versiculo_id = biblia.sortear_versiculo(testamento.value if testamento else None)
 
-		await interaction.response.send_message(embeds=embeds)
+		if versiculo_id is None:
+			return await interaction.response.send_message("A Bíblia não está carregada.", ephemeral=True)
+
+		livro, capitulo, versiculo = biblia.localizar(versiculo_id)
+		livro_meta = LIVROS_MAP.get(livro.nome.lower())
+		tipo = f" ({livro_meta['tipo']})" if livro_meta else ""
+
+		embed = discord.Embed(
+			title=f"{livro.nome} {capitulo},{versiculo}{tipo}",
+			description=f"**{versiculo}.** {biblia.texto_versiculo(versiculo_id)}",
+			colour=0xffcc00
+		)
+
+		await interaction.response.send_message(embed=embed)
+
+	@biblia_bp.command(name="buscar", description="Procure versículos por palavras")
+	@app_commands.describe(
+		termos="Palavras a procurar; use aspas para uma frase exata",
+		pagina="Página dos resultados"
+	)
+	async def buscar(self, interaction: discord.Interaction, termos: str, pagina: app_commands.Range[int, 1] = 1):
+		await interaction.response.defer(thinking=True)
+
+		# Na primeira busca o índice ainda é montado; fora do loop para não travar o bot.
+		resultados = await asyncio.to_thread(lambda: get_busca().buscar(termos))
+		total = len(resultados)
+
+		if not total:
+			return await interaction.followup.send(f"Nenhum versículo encontrado para **{termos}**.")
+
+		paginas = (total - 1) // RESULTADOS_POR_PAGINA + 1
+		pagina = min(pagina, paginas)
+		inicio = (pagina - 1) * RESULTADOS_POR_PAGINA
+
+		biblia = get_biblia()
+		linhas = []
+		for versiculo_id in resultados[inicio:inicio + RESULTADOS_POR_PAGINA]:
+			livro, capitulo, versiculo = biblia.localizar(versiculo_id)
+			texto = biblia.texto_versiculo(versiculo_id)
+			if len(texto) > TAMANHO_TRECHO_BUSCA:
+				texto = texto[:TAMANHO_TRECHO_BUSCA].rsplit(" ", 1)[0] + "…"
+			linhas.append(f"**{livro.nome} {capitulo},{versiculo}**\n{texto}")
+
+		embed = discord.Embed(
+			title=f"Busca: {termos[:200]}",
+			description="\n\n".join(linhas) + f"\n\n-# Página {pagina} de {paginas} • {total} versículos",
+			colour=0xffcc00
+		)
+		await interaction.followup.send(embed=embed)
 
 	@biblia_bp.command(name="ler", description="Leia um versículo bíblico")
 	@app_commands.choices(
@@ -65,26 +100,23 @@ class BibliaCog(commands.Cog):
 		interaction: discord.Interaction,
 		testamento: app_commands.Choice[str]
 	):
-		biblia = carregar_biblia()
-
 		await interaction.response.send_message(
 			f"📖 Você escolheu o **{testamento.name}**.\nAgora escolha um livro:",
-			view=self.LivroSelectView(biblia, testamento.value),
+			view=self.LivroSelectView(testamento.value),
 			ephemeral=True
 		)
 
 	class LivroSelect(discord.ui.Select):
-		def __init__(self, biblia: BibliaDict, testamento: str, pagina: int = 0):
-			self.biblia = biblia
+		def __init__(self, testamento: str, pagina: int = 0):
 			self.testamento = testamento
 			self.pagina = pagina
 
-			livros = biblia[testamento]
+			livros = get_biblia().testamentos[testamento]
 			inicio = pagina * 25
 			fim = inicio + 25
 
 			options = [
-				discord.SelectOption(label=livro["nome"], value=str(i))
+				discord.SelectOption(label=livro.nome, value=str(i))
 				for i, livro in enumerate(livros[inicio:fim], start=inicio)
 			]
 
@@ -97,22 +129,21 @@ class BibliaCog(commands.Cog):
 
 		async def callback(self, interaction: discord.Interaction):
 			livro_index = int(self.values[0])
-			livro = self.biblia[self.testamento][livro_index]
+			livro = get_biblia().testamentos[self.testamento][livro_index]
 
 			await interaction.response.edit_message(
-				content=f"📘 Livro selecionado: **{livro['nome']}**\nAgora escolha o capítulo:",
-				view=BibliaCog.CapituloSelectView(self.biblia, self.testamento, livro_index)
+				content=f"📘 Livro selecionado: **{livro.nome}**\nAgora escolha o capítulo:",
+				view=BibliaCog.CapituloSelectView(self.testamento, livro_index)
 			)
 
 	class LivroSelectView(discord.ui.View):
-		def __init__(self, biblia: BibliaDict, testamento: str, pagina: int = 0):
+		def __init__(self, testamento: str, pagina: int = 0):
 			super().__init__(timeout=None)
-			self.biblia = biblia
 			self.testamento = testamento
 			self.pagina = pagina
-			self.total_paginas = (len(biblia[testamento]) - 1) // 25 + 1
+			self.total_paginas = (len(get_biblia().testamentos[testamento]) - 1) // 25 + 1
 
-			self.select_menu = BibliaCog.LivroSelect(biblia, testamento, pagina)
+			self.select_menu = BibliaCog.LivroSelect(testamento, pagina)
 			self.add_item(self.select_menu)
 
 			if self.total_paginas > 1:
@@ -120,14 +151,13 @@ class BibliaCog(commands.Cog):
 				self.add_item(BibliaCog.ProximoButton(self))
 
 	class CapituloSelect(discord.ui.Select):
-		def __init__(self, biblia: BibliaDict, testamento: str, livro_index: int, pagina: int = 0):
-			self.biblia = biblia
+		def __init__(self, testamento: str, livro_index: int, pagina: int = 0):
 			self.testamento = testamento
 			self.livro_index = livro_index
 			self.pagina = pagina
 
-			livro = biblia[testamento][livro_index]
-			num_capitulos = len(livro["capitulos"])
+			livro = get_biblia().testamentos[testamento][livro_index]
+			num_capitulos = len(livro)
 			inicio = pagina * 25
 			fim = inicio + 25
 
@@ -148,7 +178,7 @@ class BibliaCog(commands.Cog):
 
 
 			views = await BibliaCog.viewBiblia(
-				self.biblia, self.testamento, self.livro_index + 1, capitulo
+				self.testamento, self.livro_index + 1, capitulo
 			)
 
 			for i, view in enumerate(views):
@@ -158,17 +188,16 @@ class BibliaCog(commands.Cog):
 					await interaction.followup.send(view=view)
 
 	class CapituloSelectView(discord.ui.View):
-		def __init__(self, biblia: BibliaDict, testamento: str, livro_index: int, pagina: int = 0):
+		def __init__(self, testamento: str, livro_index: int, pagina: int = 0):
 			super().__init__(timeout=120)
-			self.biblia = biblia
 			self.testamento = testamento
 			self.livro_index = livro_index
 			self.pagina = pagina
 
-			livro = biblia[testamento][livro_index]
-			self.total_paginas = (len(livro["capitulos"]) - 1) // 25 + 1
+			livro = get_biblia().testamentos[testamento][livro_index]
+			self.total_paginas = (len(livro) - 1) // 25 + 1
 
-			self.select_menu = BibliaCog.CapituloSelect(biblia, testamento, livro_index, pagina)
+			self.select_menu = BibliaCog.CapituloSelect(testamento, livro_index, pagina)
 			self.add_item(self.select_menu)
 
 			if self.total_paginas > 1:
@@ -185,13 +214,11 @@ class BibliaCog(commands.Cog):
 
 			if isinstance(self.parent_view, BibliaCog.LivroSelectView):
 				nova_view = BibliaCog.LivroSelectView(
-					self.parent_view.biblia,
 					self.parent_view.testamento,
 					self.parent_view.pagina
 				)
 			else:
 				nova_view = BibliaCog.CapituloSelectView(
-					self.parent_view.biblia,
 					self.parent_view.testamento,
 					self.parent_view.livro_index,
 					self.parent_view.pagina
@@ -209,13 +236,11 @@ class BibliaCog(commands.Cog):
 
 			if isinstance(self.parent_view, BibliaCog.LivroSelectView):
 				nova_view = BibliaCog.LivroSelectView(
-					self.parent_view.biblia,
 					self.parent_view.testamento,
 					self.parent_view.pagina
 				)
 			else:
 				nova_view = BibliaCog.CapituloSelectView(
-					self.parent_view.biblia,
 					self.parent_view.testamento,
 					self.parent_view.livro_index,
 					self.parent_view.pagina
@@ -225,7 +250,6 @@ class BibliaCog(commands.Cog):
 
 	@staticmethod
 	async def viewBiblia(
-		biblia: BibliaDict,
 		testamento: Literal["antigoTestamento", "novoTestamento"],
 		livro: int = 1,
 		capitulo: int = 1
@@ -236,10 +260,9 @@ class BibliaCog(commands.Cog):
 		livro -= 1
 		capitulo -= 1
 
-		livro_data = biblia[testamento][livro]
-		cap = livro_data["capitulos"][capitulo]
+		livro_data = get_biblia().testamentos[testamento][livro]
 
-		titulo = f"{livro_data['nome']} {capitulo+1}"
+		titulo = f"{livro_data.nome} {capitulo+1}"
 
 		def novo_container(continuacao: bool = False):
 			texto_titulo = f"## {titulo}" + (" (continuação)" if continuacao else "")
@@ -255,8 +278,8 @@ class BibliaCog(commands.Cog):
 
 		items_count = 3
 
-		for v in cap["versiculos"]:
-			linha = f"**{v['versiculo']}.** {v['texto']}"
+		for n, texto in enumerate(livro_data.versiculos(capitulo+1), start=1):
+			linha = f"**{n}.** {texto}"
 			container.add_item(ui.TextDisplay(linha))
 			items_count += 1
 
@@ -4,13 +4,14 @@ import io
 import os
 import subprocess
 import sys
+import time
 
 from discord import app_commands
 from discord.ext import commands
 from discord import ui
 
-from utils.data import get_config, save_config
-from utils.recursos import Bot
+from utils.data import exportar_membros, get_config, save_config
+from utils.recursos import Bot, CACHE_TRECHOS
 
 guild_ids = [get_config()["config"]["servidores"]["main"]]
 
@@ -152,16 +153,41 @@ class ConfigCog(commands.Cog):
 		await interaction.response.send_message("Aqui está o arquivo de configuração:", file=file, ephemeral=True)
 
 	@config_gp.command(name="download_members")
-	async def download_members(self, interaction: discord.Interaction):
-		from utils.data import get_members
+	@app_commands.choices(
+		formato=[
+			app_commands.Choice(name="JSON Lines", value="jsonl"),
+			app_commands.Choice(name="CSV", value="csv")
+		]
+	)
+	async def download_members(self, interaction: discord.Interaction, formato: str = "jsonl"):
+		await interaction.response.defer(ephemeral=True, thinking=True)
+
+		inicio = time.perf_counter()
+		arquivo, total = await exportar_membros(formato)
+		duracao = time.perf_counter() - inicio
 
-		config = get_members()
-		json_str = json.dumps(config, indent=4, ensure_ascii=False)
 		file = discord.File(
-			fp=io.StringIO(json_str),
-			filename="config.json"
+			fp=arquivo,
+			filename=f"membros.{formato}.gz"
+		)
+		await interaction.followup.send(
+			f"Aqui está o arquivo de membros: **{total}** membros exportados em {duracao:.2f}s.",
+			file=file,
+			ephemeral=True
+		)
+
+	@config_gp.command(name="cache", description="Veja o uso do cache de versículos (Somente ao dono do bot).")
+	@commands.is_owner()
+	async def cache_status(self, interaction: discord.Interaction):
+		stats = CACHE_TRECHOS.estatisticas()
+		consultas = stats["acertos"] + stats["falhas"]
+		taxa = stats["acertos"] / consultas * 100 if consultas else 0
+
+		await interaction.response.send_message(
+			f"Trechos em cache: **{stats['itens']}**\n"
+			f"Acertos: **{stats['acertos']}** | Falhas: **{stats['falhas']}** ({taxa:.1f}% de acerto)",
+			ephemeral=True
 		)
-		await interaction.response.send_message("Aqui está o arquivo de membros:", file=file, ephemeral=True)
 
 	@config_gp.command(name="server", description="Define o tipo de servidor.")
 	@commands.is_owner()
@@ -7,7 +7,7 @@ import re
 from discord import app_commands, ui
 from discord.ext import commands, tasks
 
-from utils.recursos import Bot, expand_bible_verse
+from utils.recursos import Bot, expandir_trechos
 from utils.permissoes import permissao
 from utils.data import save_config
 
@@ -378,15 +378,12 @@ class LiturgiaCog(commands.Cog):
 			if referencia:
 				titulo_base += f" - {referencia}"
 
-			versiculos_info = expand_bible_verse(
+			trechos = expandir_trechos(
 				referencia.replace(", ", ",").replace(". ", ".")
 			) if referencia else None
 
-			if versiculos_info:
-				todos_versiculos = []
-				for v in versiculos_info:
-					todos_versiculos.extend(v["texto"])
-				texto_final = "\n".join(todos_versiculos)
+			if trechos:
+				texto_final = "\n".join(t.texto_unido for t in trechos)
 			else:
 				texto_final = texto
 
@@ -3,7 +3,6 @@ import chat_exporter
 import datetime
 import discord
 import io
-import unicodedata
 import random
 import re
 
@@ -14,28 +13,15 @@ from discord import ui, app_commands
 from discord.ext import commands
 
 from utils.catecismo import check_cic_verse, load_session
-from utils.data import DataFiles, get_member, save_member
+from utils.data import DataFiles, get_member, increment_member_counter
 from utils.logs import log_normal, log_punicao, TipoPunicao
-from utils.recursos import Bot, expand_bible_verse, _personalize_transcript
+from utils.recursos import Bot, VERSICULOS_POR_BLOCO, expand_bible_verse, expandir_trechos, _personalize_transcript
+from utils.texto import normalizar
 
 from .sacerdocio import SacerdocioCog
 
-CYRILLIC_TO_LATIN = str.maketrans({
-	"А": "A", "В": "B", "Е": "E", "К": "K", "М": "M",
-	"Н": "H", "О": "O", "Р": "P", "С": "C", "Т": "T",
-	"Х": "X", "а": "a", "е": "e", "о": "o", "р": "p",
-	"с": "c", "у": "y", "х": "x", "і": "i", "ј": "j",
-})
-
-def normalizar(texto: str) -> str:
-	texto = texto.lower()
-	texto = unicodedata.normalize("NFD", texto)
-	texto = "".join(c for c in texto if unicodedata.category(c) != "Mn")
-	texto = texto.translate(CYRILLIC_TO_LATIN)
-	texto = texto.replace("0", "o").replace("1", "i").replace("3", "e").replace("4", "a")
-	texto = texto.replace("5", "s").replace("7", "t")
-	texto = re.sub(r"(.)\1{2,}", r"\1", texto)
-	return texto
+# Containers por referência no chat; "Gn 1-50" não pode virar dezenas de mensagens.
+MAX_BLOCOS_TRECHO = 5
 
 def gerar_variacoes(palavras: list[str]) -> set[str]:
 	variacoes = set()
@@ -108,7 +94,7 @@ class LogsCog(commands.Cog):
 	@app_commands.command(name="badwords", description="Veja a quantidade de palavrões que alguém falou.")
 	async def badwords_count(self, interaction: discord.Interaction, member: discord.User = None):
 		user = member if member else interaction.user
-		member_data = get_member(user.id)
+		member_data = await get_member(user.id)
 		final = "ões registrados" if member_data["palavroes"] > 1 else "ão registrado"
 		await interaction.response.send_message(f"{user.mention} tem **{member_data['palavroes']}** palavr{final}.", ephemeral=True)
 	
@@ -304,12 +290,10 @@ class LogsCog(commands.Cog):
 				await msg.reply(resposta)
 			await msg.delete()
 
-			member_data = get_member(msg.author.id)
-			member_data["palavroes"] += 1
-			save_member(msg.author.id, member_data)
+			palavroes = await increment_member_counter(msg.author.id, "palavroes")
 
-			if member_data["palavroes"] > 3:
-				duracao = datetime.timedelta(minutes=member_data["palavroes"])
+			if palavroes > 3:
+				duracao = datetime.timedelta(minutes=palavroes)
 
 				await msg.author.timeout(duracao, reason="Falando muitos palavrões.")
 			
@@ -328,51 +312,40 @@ class LogsCog(commands.Cog):
 				await self.enviar_novo_nivel(msg.guild, msg.author)
 
 	async def check_bible_verse(self, msg: discord.Message):
-		resultados = expand_bible_verse(msg.content)
+		trechos = expandir_trechos(msg.content, inline=True)
 
-		for res in resultados:
-			versiculo_inicial = res['versículo_inicial']
-			versiculo_final = res['versículo_final']
-			versiculo = versiculo_inicial if versiculo_inicial == versiculo_final else f"{versiculo_inicial}-{versiculo_final}"
-
-			tipo = res['tipo']
+		for trecho in trechos:
+			for i, bloco in enumerate(trecho.blocos()):
+				if i == MAX_BLOCOS_TRECHO:
+					await msg.channel.send(
+						f"-# Trecho longo demais: mostrando só os primeiros {MAX_BLOCOS_TRECHO * VERSICULOS_POR_BLOCO} versículos de {len(trecho)}."
+					)
+					break
 
-			passagem = f"{res['capítulo']},{versiculo}"
+				view = ui.LayoutView()
 
-			view = ui.LayoutView()
-			container = ui.Container(
-				ui.Section(
-					ui.TextDisplay(f"## {res['livro']} {passagem} ({tipo})"),
-					accessory=ui.Thumbnail("https://upload.wikimedia.org/wikipedia/commons/7/78/Red_Chi_Rho_sign.png")
-				),
-				accent_color=0xFFCC00
-			)
-			novos_containers = 0
-
-			container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
-			items_count = 4
-
-			for v in res["texto"]:
-				container.add_item(ui.TextDisplay(v))
-				items_count+=1
-				if items_count == 40:
-					view.add_item(container)
-					if novos_containers == 0:
-						await msg.reply(view=view)
-					else:
-						await msg.channel.send(view=view)
-					
-					view = ui.LayoutView()
+				if i == 0:
+					container = ui.Container(
+						ui.Section(
+							ui.TextDisplay(f"## {trecho.titulo}"),
+							accessory=ui.Thumbnail("https://upload.wikimedia.org/wikipedia/commons/7/78/Red_Chi_Rho_sign.png")
+						),
+						accent_color=0xFFCC00
+					)
+				else:
 					container = ui.Container(
-						ui.TextDisplay(f"## {res['livro']} {passagem} ({tipo})"),
+						ui.TextDisplay(f"## {trecho.titulo}"),
 						accent_color=0xFFCC00
 					)
-					container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
-					items_count = 3
 
-			if items_count > 3:
+				container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
+
+				for v in bloco:
+					container.add_item(ui.TextDisplay(v))
+
 				view.add_item(container)
-				if novos_containers == 0:
+
+				if i == 0:
 					await msg.reply(view=view)
 				else:
 					await msg.channel.send(view=view)
@@ -4,23 +4,22 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
-from utils.data import get_member, save_member
+from utils.data import add_warn, count_warns, get_warns, remove_warn
 from utils.logs import log_punicao, make_embed, TipoPunicao
 from utils.permissoes import permissao
 from utils.recursos import Bot
 from utils.data import WarnsJson
 
+WARNS_POR_PAGINA = 10
+
 def is_staff():
 	return app_commands.checks.has_permissions(mute_members=True)
 
 class RemoveWarnOptions(discord.ui.Select):
-	def __init__(self, membro: discord.Member, motivo: str):
-		membro_json = get_member(membro.id)
-		warns = membro_json["warns"]
-
+	def __init__(self, membro: discord.Member, motivo: str, warns: list[WarnsJson]):
 		options = [
-			discord.SelectOption(label=warn["motivo"][:100], value=str(i))
-			for i, warn in enumerate(warns)
+			discord.SelectOption(label=warn["motivo"][:100], value=str(warn["id"]))
+			for warn in warns
 		]
 
 		super().__init__(
@@ -37,15 +36,10 @@ class RemoveWarnOptions(discord.ui.Select):
 		if not interaction.user.guild_permissions.moderate_members:
 			return await interaction.response.send_message("❌ Sem permissão.", ephemeral=True)
 
-		membro_json = get_member(self.membro.id)
-
-		index = int(self.values[0])
-		if index >= len(membro_json["warns"]):
+		warn_original = await remove_warn(int(self.values[0]), self.membro.id)
+		if warn_original is None:
 			return await interaction.response.send_message("⚠️ Essa penitência já foi removida.", ephemeral=True)
 
-		warn_original = membro_json["warns"].pop(index)
-		save_member(self.membro.id, membro_json)
-
 		embed = make_embed(
 			"Penitência removida",
 			f"{self.membro.mention} teve uma penitência removida.\n\n"
@@ -70,14 +64,12 @@ class WarnGP(app_commands.Group):
 	async def warn_add(self, interaction: discord.Interaction, membro: discord.Member, motivo: str = "Não informado"):
 		await interaction.response.defer(ephemeral=True)
 
-		novo_warn = WarnsJson()
-		novo_warn["dado_por"] = interaction.user.id
-		novo_warn["motivo"] = motivo
-		novo_warn["quando"] = datetime.datetime.now(datetime.timezone.utc).timestamp()
-
-		membro_json = get_member(membro.id)
-		membro_json["warns"].append(novo_warn)
-		save_member(membro.id, membro_json)
+		total_warns = await add_warn(
+			membro.id,
+			dado_por=interaction.user.id,
+			motivo=motivo,
+			quando=datetime.datetime.now(datetime.timezone.utc).timestamp(),
+		)
 
 		tabela_mute = [
 			{"hours": 1},
@@ -87,7 +79,7 @@ class WarnGP(app_commands.Group):
 			{"weeks": 1},
 		]
 
-		idx = min(len(membro_json["warns"]) - 1, len(tabela_mute) - 1)
+		idx = min(total_warns - 1, len(tabela_mute) - 1)
 		dados = tabela_mute[idx]
 		duracao = datetime.timedelta(
 			hours=dados.get("hours", 0),
@@ -114,15 +106,20 @@ class WarnGP(app_commands.Group):
 		await log_punicao(interaction.guild, TipoPunicao.Warn, membro, interaction.user, motivo)
 	
 	@app_commands.command(name="log", description="Veja as penitências de um membro")
+	@app_commands.describe(pagina="Página da lista de penitências")
 	@is_staff()
-	async def warn_logs(self, interaction: discord.Interaction, membro: discord.Member):
-		membro_json = get_member(membro.id)
+	async def warn_logs(self, interaction: discord.Interaction, membro: discord.Member, pagina: app_commands.Range[int, 1] = 1):
+		total = await count_warns(membro.id)
 
-		if not membro_json["warns"]:
+		if not total:
 			return await interaction.response.send_message("Esse membro não possui penitências.", ephemeral=True)
 
+		paginas = (total - 1) // WARNS_POR_PAGINA + 1
+		pagina = min(pagina, paginas)
+		warns = await get_warns(membro.id, limite=WARNS_POR_PAGINA, offset=(pagina - 1) * WARNS_POR_PAGINA)
+
 		linhas = []
-		for w in membro_json["warns"]:
+		for w in warns:
 			linhas.append(
 				f"> Motivo: {w['motivo']}\n"
 				f"> Staff: <@{w['dado_por']}>\n"
@@ -131,7 +128,7 @@ class WarnGP(app_commands.Group):
 
 		embed = make_embed(
 			"Penitências do membro",
-			f"{membro.mention}\n\n" + "\n\n".join(linhas),
+			f"{membro.mention}\n\n" + "\n\n".join(linhas) + f"\n\n-# Página {pagina} de {paginas} • {total} penitências",
 			discord.Color.red(),
 			user=membro,
 		)
@@ -147,9 +144,9 @@ class WarnGP(app_commands.Group):
 		membro: discord.Member,
 		motivo: str = "Não informado",
 	):
-		membro_json = get_member(membro.id)
+		warns = await get_warns(membro.id, limite=25)
 
-		if not membro_json["warns"]:
+		if not warns:
 			embed = make_embed(
 				"Sem penitências",
 				f"{membro.mention} não possui penitências ativas.",
@@ -166,7 +163,7 @@ class WarnGP(app_commands.Group):
 		)
 
 		view = discord.ui.View(timeout=60)
-		view.add_item(self.RemoveWarnOptions(membro=membro, motivo=motivo))
+		view.add_item(RemoveWarnOptions(membro=membro, motivo=motivo, warns=warns))
 
 		await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
@@ -1,5 +1,6 @@
 import aiohttp
 import discord
+import sqlite3
 import xml.etree.ElementTree as ET
 import datetime
 
@@ -14,7 +15,7 @@ from html.parser import HTMLParser
 from typing import TypedDict, Literal
 
 from utils.recursos import Bot
-from utils.data import get_connection
+from utils.data import executar
 
 RSS_FEED_URL = "https://www.vaticannews.va/pt.rss.xml"
 VATICAN_NEWS_ICON = "https://yt3.googleusercontent.com/oUqd0UFUR4S99mrjuaWZNacoCKTlsFGwwFKNeDUwBOBAPd2NZt2GhrLKYDKAwTt9pbHrXbhZxw=s160-c-k-c0x00ffffff-no-rj"
@@ -27,30 +28,21 @@ class NewsConfig(TypedDict, total=False):
 	canal: int
 
 
-def get_news_config_db(guild_id: int) -> NewsConfig:
-	try:
-		conn = get_connection()
-		cursor = conn.cursor()
-		cursor.execute("SELECT * FROM vatican_news_config WHERE guild_id = ?", (guild_id,))
-		row = cursor.fetchone()
-		if not row:
-			return {}
-		return {
-			"ping": row["ping"],
-			"webhook_url": row["webhook_url"],
-			"canal": row["canal"],
-			"ultimo_guid": row["ultimo_guid"]
-		}
-	finally:
-		cursor.close()
-		conn.close()
+def _get_news_config_db(conn: sqlite3.Connection, guild_id: int) -> NewsConfig:
+	row = conn.execute("SELECT * FROM vatican_news_config WHERE guild_id = ?", (guild_id,)).fetchone()
+	if not row:
+		return {}
+	return {
+		"ping": row["ping"],
+		"webhook_url": row["webhook_url"],
+		"canal": row["canal"],
+		"ultimo_guid": row["ultimo_guid"]
+	}
 
 
-def save_news_config_db(guild_id: int, config: NewsConfig):
-	try:
-		conn = get_connection()
-		cursor = conn.cursor()
-		cursor.execute("""
+def _save_news_config_db(conn: sqlite3.Connection, guild_id: int, config: NewsConfig):
+	with conn:
+		conn.execute("""
 			INSERT INTO vatican_news_config (guild_id, ping, webhook_url, canal, ultimo_guid)
 			VALUES (?, ?, ?, ?, ?)
 			ON CONFLICT(guild_id) DO UPDATE SET
@@ -65,19 +57,23 @@ def save_news_config_db(guild_id: int, config: NewsConfig):
 			config.get("canal"),
 			config.get("ultimo_guid")
 		))
-		conn.commit()
-	finally:
-		cursor.close()
-		conn.close()
 
-def carregar_ultimo_guid(guild_id: int) -> str | None:
-	return get_news_config_db(guild_id).get("ultimo_guid")
+async def get_news_config_db(guild_id: int) -> NewsConfig:
+	return await executar(_get_news_config_db, guild_id)
+
 
+async def save_news_config_db(guild_id: int, config: NewsConfig):
+	await executar(_save_news_config_db, guild_id, dict(config))
 
-def salvar_ultimo_guid(guild_id: int, guid: str):
-	config = get_news_config_db(guild_id)
+
+async def carregar_ultimo_guid(guild_id: int) -> str | None:
+	return (await get_news_config_db(guild_id)).get("ultimo_guid")
+
+
+async def salvar_ultimo_guid(guild_id: int, guid: str):
+	config = await get_news_config_db(guild_id)
 	config["ultimo_guid"] = guid
-	save_news_config_db(guild_id, config)
+	await save_news_config_db(guild_id, config)
 
 
 class HTMLToDiscord(HTMLParser):
@@ -227,7 +223,7 @@ class VaticanNewsCog(commands.Cog):
 	@tasks.loop(minutes=1)
 	async def check_news(self):
 		SERVER_ID = 1429152785252876328
-		config = get_news_config_db(SERVER_ID)
+		config = await get_news_config_db(SERVER_ID)
 		webhook_url = config.get("webhook_url")
 		if not webhook_url:
 			return
@@ -239,13 +235,13 @@ class VaticanNewsCog(commands.Cog):
 		if not noticia:
 			return
 
-		ultimo_guid = carregar_ultimo_guid(SERVER_ID)
+		ultimo_guid = await carregar_ultimo_guid(SERVER_ID)
 		if noticia["guid"] == ultimo_guid:
 			return
 
 		new = NewsView(noticia=noticia, ping=ping)
 		await webhook.send(view=new, files=new.files)
-		salvar_ultimo_guid(SERVER_ID, noticia["guid"])
+		await salvar_ultimo_guid(SERVER_ID, noticia["guid"])
 
 	news_gp = app_commands.Group(
 		name="news", description="Comandos relacionados às notícias do Vaticano."
@@ -259,7 +255,7 @@ class VaticanNewsCog(commands.Cog):
 
 	@news_gp.command(name="vnstatus", description="Verificar o último GUID salvo.")
 	async def status(self, interaction: discord.Interaction):
-		ultimo = carregar_ultimo_guid(interaction.guild.id) or "Nenhum ainda"
+		ultimo = await carregar_ultimo_guid(interaction.guild.id) or "Nenhum ainda"
 		await interaction.response.send_message(
 			f"Último GUID salvo: `{ultimo}`", ephemeral=True
 		)
@@ -325,9 +321,9 @@ class SetNewsConfig(ui.LayoutView):
 	async def _on_ping_selected(self, interaction: discord.Interaction):
 		role: discord.Role = self.select.values[0]
 
-		config = get_news_config_db(interaction.guild.id)
+		config = await get_news_config_db(interaction.guild.id)
 		config["ping"] = role.id
-		save_news_config_db(interaction.guild.id, config)
+		await save_news_config_db(interaction.guild.id, config)
 
 		await self._finish(
 			interaction, f"Cargo configurado com sucesso: {role.mention}."
@@ -351,10 +347,10 @@ class SetNewsConfig(ui.LayoutView):
 			)
 
 		if len(webhooks) == 1:
-			config = get_news_config_db(interaction.guild.id)
+			config = await get_news_config_db(interaction.guild.id)
 			config["webhook_url"] = webhooks[0].url
 			config["canal"] = channel.id
-			save_news_config_db(interaction.guild.id, config)
+			await save_news_config_db(interaction.guild.id, config)
 
 			return await self._finish(
 				interaction, f"Webhook configurado com sucesso em {channel.mention}."
@@ -394,10 +390,10 @@ class SetNewsConfig(ui.LayoutView):
 			webhook_id = int(self.webhook_select.values[0])
 			webhook = discord.utils.get(webhooks, id=webhook_id)
 
-			config = get_news_config_db(interaction_select.guild.id)
+			config = await get_news_config_db(interaction_select.guild.id)
 			config["webhook_url"] = webhook.url
-			config["canal"] = channel
-			save_news_config_db(interaction_select.guild.id, config)
+			config["canal"] = channel.id
+			await save_news_config_db(interaction_select.guild.id, config)
 
 			await self._finish(
 				interaction_select,
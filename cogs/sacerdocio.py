@@ -1,6 +1,5 @@
 import datetime
 import discord
-import json
 import random
 
 from discord import app_commands
@@ -9,7 +8,7 @@ from discord.ext import commands
 
 from typing import Callable
 
-from utils.data import DataFiles, CanonesDict, get_config
+from utils.data import CanonesDict, get_canones, get_config, save_canones
 from utils.recursos import Bot, contar, expand_bible_verse
 from utils.permissoes import permissao
 
@@ -806,11 +805,9 @@ class ModalRegras(discord.ui.Modal):
 			item: discord.ui.TextInput
 			self.regras[item.id] = item.value
 		
-		with open(DataFiles.CANONES.value, "r", encoding="utf-8") as f:
-			canones = json.load(f)
+		canones = get_canones()
 		canones["Regras"] = self.regras
-		with open(DataFiles.CANONES.value, "w", encoding="utf-8") as f:
-			json.dump(canones, f, indent=4, ensure_ascii=False)
+		save_canones(canones)
 
 		await interaction.response.send_message("Regras atualizadas com sucesso!", ephemeral=True)
 
@@ -821,9 +818,7 @@ class CanonesCog(commands.Cog):
 	
 	@staticmethod
 	def get_regras() -> list[str]:
-		with open(DataFiles.CANONES.value, "r", encoding="utf-8") as f:
-			canones = json.load(f)["Regras"]
-		return canones
+		return get_canones()["Regras"]
 	
 	regras_gp = app_commands.Group(name="regras", description="Comandos relacionados as regras do servidor.")
 
@@ -887,9 +882,7 @@ class CanonesCog(commands.Cog):
 		await interaction.response.send_modal(ModalRegras(i=numero))
 	
 	def get_canones(self) -> list[CanonesDict]:
-		with open(DataFiles.CANONES.value, "r", encoding="utf-8") as f:
-			canones = json.load(f)["Cânones"]
-		return canones
+		return get_canones()["Cânones"]
 	
 	canone_gp = app_commands.Group(name="canone", description="Comandos relacionados aos cânones da comunidade.")
 
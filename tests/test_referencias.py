@@ -0,0 +1,24 @@
+from utils.recursos import encontrar_referencias_inline
+
+
+def livros(mensagem: str) -> list[tuple]:
+	return [(meta["livro"], c1, v1, c2, v2) for meta, c1, v1, c2, v2 in encontrar_referencias_inline(mensagem)]
+
+
+def test_livro_com_erro_de_digitacao_no_chat():
+	assert livros("alguém leu Genesys 1,1 hoje?") == [("Gênesis", 1, 1, 1, 1)]
+	assert livros("Exodoo 2,1") == [("Êxodo", 2, 1, 2, 1)]
+	assert livros("leiam Apocalipce 1,1-3 e Jo 3,16") == [
+		("Apocalipse", 1, 1, 1, 3),
+		("São João", 3, 16, 3, 16),
+	]
+
+
+def test_erro_de_digitacao_nao_troca_o_numero_do_livro():
+	assert livros("leia 2 Pedro 1,1") == [("II São Pedro", 1, 1, 1, 1)]
+	assert livros("leia 1 Joao 1,1") == [("I São João", 1, 1, 1, 1)]
+
+
+def test_palavras_comuns_nao_viram_referencia():
+	assert livros("tomei os 2,5 litros") == []
+	assert livros("cheguei na 1,5 hora") == []
@@ -0,0 +1,422 @@
+"""
+Índice da Bíblia, montado uma única vez a partir do `data/biblia.json`.
+
+Os textos de todos os versículos ficam num único buffer UTF-8 e as posições em
+tabelas `array`: onde começa cada versículo no buffer, qual o primeiro versículo
+de cada capítulo e qual o primeiro capítulo de cada livro. Cada versículo tem um
+id global (a sua posição na Bíblia inteira), e o texto só é decodificado quando
+alguém pede.
+
+Esse formato é salvo em `data/biblia.bin` e aberto com `mmap` nas próximas
+inicializações, sem precisar ler o JSON. O cache é refeito sozinho quando o
+hash do JSON muda, ou na mão com `python -m utils.biblia`.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+
+from array import array
+from collections import Counter
+
+from .data import BibliaDict, DataFiles, SERIALIZADOR, escrever_atomico
+from .texto import normalizar
+
+CACHE_BIBLIA = os.path.splitext(DataFiles.BIBLIA.value)[0] + ".bin"
+VERSAO_CACHE = 1
+MAGICO = b"SCBIBLIA"
+
+# mágico, versão, hash do JSON, tamanho e mtime do JSON, nº de livros,
+# capítulos e versículos, tamanho dos metadados dos livros.
+CABECALHO = struct.Struct("<8sH16sQQIIII")
+
+class LivroBiblia:
+	__slots__ = ("indice", "nome", "testamento", "_biblia")
+
+	def __init__(self, biblia: "IndiceBiblia", indice: int, nome: str, testamento: str):
+		self._biblia = biblia
+		self.indice = indice
+		self.nome = nome
+		self.testamento = testamento
+
+	def __len__(self) -> int:
+		inicio_livro = self._biblia.inicio_livro
+		return inicio_livro[self.indice + 1] - inicio_livro[self.indice]
+
+	def limites(self, capitulo: int) -> tuple[int, int]:
+		"""Ids globais do primeiro versículo do capítulo e do seguinte ao último."""
+		if not 1 <= capitulo <= len(self):
+			return 0, 0
+		c = self._biblia.inicio_livro[self.indice] + capitulo - 1
+		inicio_capitulo = self._biblia.inicio_capitulo
+		return inicio_capitulo[c], inicio_capitulo[c + 1]
+
+	def versiculos(self, capitulo: int) -> list[str]:
+		"""Textos de todos os versículos do capítulo (começando em 1)."""
+		inicio, fim = self.limites(capitulo)
+		return [self._biblia.texto_versiculo(v) for v in range(inicio, fim)]
+
+	def faixa(self, capitulo: int, versiculo: int, capitulo_final: int, versiculo_final: int) -> tuple[int, int]:
+		"""
+		Ids globais do trecho de (capítulo, versículo) até (capitulo_final,
+		versiculo_final), inclusive, podendo atravessar capítulos. O fim passa
+		do último capítulo ou versículo existente é cortado.
+		"""
+		primeiro, ultimo = self.limites(capitulo)
+		inicio = primeiro + max(versiculo, 1) - 1
+		if inicio >= ultimo:
+			return 0, 0
+
+		primeiro, ultimo = self.limites(min(capitulo_final, len(self)))
+		fim = min(primeiro + versiculo_final, ultimo)
+		if fim <= inicio:
+			return 0, 0
+		return inicio, fim
+
+	def iterar(self, inicio: int, fim: int):
+		"""Gera (capítulo, versículo, texto) para os ids globais de `inicio` a `fim` (exclusivo)."""
+		biblia = self._biblia
+		c = biblia._capitulo(inicio)
+		capitulo = c - biblia.inicio_livro[self.indice] + 1
+		proximo = biblia.inicio_capitulo[c + 1]
+		versiculo = inicio - biblia.inicio_capitulo[c] + 1
+
+		for versiculo_id in range(inicio, fim):
+			if versiculo_id == proximo:
+				c += 1
+				capitulo += 1
+				proximo = biblia.inicio_capitulo[c + 1]
+				versiculo = 1
+			yield capitulo, versiculo, biblia.texto_versiculo(versiculo_id)
+			versiculo += 1
+
+class IndiceBiblia:
+	def __init__(
+		self,
+		texto: bytes | memoryview,
+		offsets: array,
+		inicio_capitulo: array,
+		inicio_livro: array,
+		livros: list[tuple[str, str]]
+	):
+		self.texto = texto
+		self.offsets = offsets
+		self.inicio_capitulo = inicio_capitulo
+		self.inicio_livro = inicio_livro
+		self.testamentos: dict[str, list[LivroBiblia]] = {}
+		self.livros: dict[str, LivroBiblia] = {}
+		self.ordem: list[LivroBiblia] = []
+		self._capitulo_de: array | None = None
+		self._livro_de: array | None = None
+
+		for nome, testamento in livros:
+			lista = self.testamentos.setdefault(testamento, [])
+			item = LivroBiblia(self, len(self.ordem), nome, testamento)
+			lista.append(item)
+			self.ordem.append(item)
+			self.livros[nome.lower()] = item
+
+	@classmethod
+	def do_json(cls, biblia: BibliaDict) -> "IndiceBiblia":
+		partes: list[bytes] = []
+		offsets = array("I", [0])
+		inicio_capitulo = array("I", [0])
+		inicio_livro = array("I", [0])
+		livros = []
+
+		tamanho = 0
+		for testamento, lista in biblia.items():
+			for livro in lista:
+				for capitulo in livro["capitulos"]:
+					for v in capitulo["versiculos"]:
+						bruto = v["texto"].encode("utf-8")
+						partes.append(bruto)
+						tamanho += len(bruto)
+						offsets.append(tamanho)
+					inicio_capitulo.append(len(offsets) - 1)
+				inicio_livro.append(len(inicio_capitulo) - 1)
+				livros.append((livro["nome"], testamento))
+
+		return cls(b"".join(partes), offsets, inicio_capitulo, inicio_livro, livros)
+
+	@classmethod
+	def do_cache(cls, arquivo: str) -> "IndiceBiblia":
+		"""Abre o cache binário com `mmap`; o texto é lido direto do arquivo."""
+		with open(arquivo, "rb") as f:
+			mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		_, _, _, _, _, n_livros, n_capitulos, n_versiculos, tamanho_meta = CABECALHO.unpack_from(mapa)
+		pos = CABECALHO.size
+		livros = [tuple(item) for item in SERIALIZADOR.loads(mapa[pos:pos + tamanho_meta])]
+		pos += tamanho_meta
+
+		tabelas = []
+		for n in (n_livros, n_capitulos, n_versiculos):
+			tabela = array("I")
+			tabela.frombytes(mapa[pos:pos + (n + 1) * tabela.itemsize])
+			if sys.byteorder == "big":
+				tabela.byteswap()
+			tabelas.append(tabela)
+			pos += (n + 1) * tabela.itemsize
+
+		inicio_livro, inicio_capitulo, offsets = tabelas
+		return cls(memoryview(mapa)[pos:pos + offsets[-1]], offsets, inicio_capitulo, inicio_livro, livros)
+
+	def salvar_cache(self, arquivo: str, digest: bytes, tamanho_json: int, mtime_json: int):
+		meta = SERIALIZADOR.dumps([[livro.nome, livro.testamento] for livro in self.ordem]).encode("utf-8")
+		partes = [
+			CABECALHO.pack(
+				MAGICO, VERSAO_CACHE, digest, tamanho_json, mtime_json,
+				len(self.ordem), len(self.inicio_capitulo) - 1, len(self), len(meta)
+			),
+			meta
+		]
+
+		for tabela in (self.inicio_livro, self.inicio_capitulo, self.offsets):
+			if sys.byteorder == "big":
+				tabela = array(tabela.typecode, tabela)
+				tabela.byteswap()
+			partes.append(tabela.tobytes())
+
+		partes.append(bytes(self.texto))
+		escrever_atomico(arquivo, b"".join(partes))
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def texto_versiculo(self, versiculo_id: int) -> str:
+		return str(self.texto[self.offsets[versiculo_id]:self.offsets[versiculo_id + 1]], "utf-8")
+
+	def livro(self, nome: str) -> LivroBiblia | None:
+		return self.livros.get(nome.lower())
+
+	def _montar_tabelas(self):
+		# Capítulo global de cada versículo e livro de cada capítulo, para localizar em O(1).
+		capitulo_de = array("I")
+		for c in range(len(self.inicio_capitulo) - 1):
+			capitulo_de.extend([c] * (self.inicio_capitulo[c + 1] - self.inicio_capitulo[c]))
+
+		livro_de = array("H")
+		for livro in range(len(self.inicio_livro) - 1):
+			livro_de.extend([livro] * (self.inicio_livro[livro + 1] - self.inicio_livro[livro]))
+
+		self._capitulo_de = capitulo_de
+		self._livro_de = livro_de
+
+	def _capitulo(self, versiculo_id: int) -> int:
+		"""Índice global do capítulo de um versículo."""
+		if self._capitulo_de is None:
+			self._montar_tabelas()
+		return self._capitulo_de[versiculo_id]
+
+	def localizar(self, versiculo_id: int) -> tuple[LivroBiblia, int, int]:
+		"""Livro, capítulo e versículo (começando em 1) de um id global."""
+		c = self._capitulo(versiculo_id)
+		livro = self.ordem[self._livro_de[c]]
+		capitulo = c - self.inicio_livro[livro.indice] + 1
+		return livro, capitulo, versiculo_id - self.inicio_capitulo[c] + 1
+
+	def faixa_testamento(self, testamento: str) -> tuple[int, int]:
+		"""Ids globais do primeiro versículo do testamento e do seguinte ao último."""
+		livros = self.testamentos.get(testamento)
+		if not livros:
+			return 0, 0
+		primeiro = self.inicio_livro[livros[0].indice]
+		ultimo = self.inicio_livro[livros[-1].indice + 1]
+		return self.inicio_capitulo[primeiro], self.inicio_capitulo[ultimo]
+
+	def sortear_versiculo(self, testamento: str | None = None) -> int | None:
+		"""
+		Id de um versículo sorteado com a mesma chance para todos, da Bíblia
+		inteira ou só de um testamento.
+		"""
+		inicio, fim = self.faixa_testamento(testamento) if testamento else (0, len(self))
+		if fim <= inicio:
+			return None
+		return random.randrange(inicio, fim)
+
+def _ler_cabecalho(arquivo: str) -> tuple | None:
+	try:
+		with open(arquivo, "rb") as f:
+			cabecalho = CABECALHO.unpack(f.read(CABECALHO.size))
+	except (OSError, struct.error):
+		return None
+
+	if cabecalho[0] != MAGICO or cabecalho[1] != VERSAO_CACHE:
+		return None
+	return cabecalho
+
+def _atualizar_cabecalho(cache: str, cabecalho: tuple, st: os.stat_result):
+	try:
+		with open(cache, "rb") as f:
+			bruto = f.read()
+		novo = CABECALHO.pack(*cabecalho[:3], st.st_size, st.st_mtime_ns, *cabecalho[5:])
+		escrever_atomico(cache, novo + bruto[CABECALHO.size:])
+	except OSError as e:
+		print(f"[BIBLIA] Não foi possível atualizar o cabeçalho de {cache}: {e}")
+
+def carregar_indice(arquivo: str = DataFiles.BIBLIA.value, cache: str = CACHE_BIBLIA, reconstruir: bool = False) -> IndiceBiblia:
+	"""
+	Abre o índice pelo cache binário quando ele corresponde ao JSON atual.
+	Senão, monta o índice a partir do JSON e grava um cache novo.
+	"""
+	cabecalho = None if reconstruir else _ler_cabecalho(cache)
+
+	try:
+		st = os.stat(arquivo)
+	except FileNotFoundError:
+		if cabecalho is not None:
+			return IndiceBiblia.do_cache(cache)
+		return IndiceBiblia.do_json({})
+
+	# Tamanho e mtime iguais dispensam ler o JSON.
+	if cabecalho is not None and (cabecalho[3], cabecalho[4]) == (st.st_size, st.st_mtime_ns):
+		return IndiceBiblia.do_cache(cache)
+
+	with open(arquivo, "rb") as f:
+		bruto = f.read()
+
+	digest = hashlib.blake2b(bruto, digest_size=16).digest()
+	if cabecalho is not None and cabecalho[2] == digest:
+		# Mesmo conteúdo com outro tamanho ou mtime (cópia, checkout): guarda os
+		# novos no cabeçalho para a próxima inicialização não ler o JSON de novo.
+		_atualizar_cabecalho(cache, cabecalho, st)
+		return IndiceBiblia.do_cache(cache)
+
+	indice = IndiceBiblia.do_json(SERIALIZADOR.loads(bruto))
+	del bruto
+
+	try:
+		indice.salvar_cache(cache, digest, st.st_size, st.st_mtime_ns)
+		print(f"[BIBLIA] Cache {cache} reconstruído ({len(indice)} versículos).")
+	except OSError as e:
+		print(f"[BIBLIA] Não foi possível gravar o cache {cache}: {e}")
+
+	return indice
+
+PALAVRA_BUSCA = re.compile(r"[a-z]+")
+FRASE_BUSCA = re.compile(r'"([^"]*)"')
+
+
+def tokens_busca(texto: str) -> list[str]:
+	"""Palavras do texto com as mesmas regras de `normalizar` do filtro de palavrões."""
+	return PALAVRA_BUSCA.findall(normalizar(texto))
+
+class IndiceBusca:
+	"""
+	Índice invertido da Bíblia: para cada palavra, os ids globais dos
+	versículos onde ela aparece (repetidos quando aparece mais de uma vez)
+	e, em paralelo, a posição da palavra dentro do versículo.
+	"""
+
+	def __init__(self, biblia: IndiceBiblia):
+		self.biblia = biblia
+		self.tamanhos = array("H")
+		self.postings: dict[str, array] = {}
+		self.posicoes: dict[str, array] = {}
+
+		for versiculo_id in range(len(biblia)):
+			tokens = tokens_busca(biblia.texto_versiculo(versiculo_id))
+			self.tamanhos.append(min(len(tokens), 0xFFFF))
+			for posicao, token in enumerate(tokens[:0xFFFF]):
+				lista = self.postings.get(token)
+				if lista is None:
+					lista = self.postings[token] = array("I")
+					self.posicoes[token] = array("H")
+				lista.append(versiculo_id)
+				self.posicoes[token].append(posicao)
+
+	def idf(self, token: str) -> float:
+		return math.log(1 + len(self.tamanhos) / (1 + len(self.postings.get(token, ()))))
+
+	def buscar(self, consulta: str) -> list[int]:
+		"""
+		Ids dos versículos com todas as palavras da consulta, dos mais
+		relevantes aos menos. Trechos entre aspas precisam aparecer em sequência.
+		"""
+		frases = [tokens_busca(f) for f in FRASE_BUSCA.findall(consulta)]
+		frases = [f for f in frases if f]
+		termos = list(dict.fromkeys(tokens_busca(consulta)))
+
+		if not termos:
+			return []
+
+		listas = []
+		for termo in termos:
+			lista = self.postings.get(termo)
+			if lista is None:
+				return []
+			listas.append(lista)
+
+		# Começa pela palavra mais rara, que deixa menos candidatos.
+		ordem = sorted(range(len(termos)), key=lambda i: len(listas[i]))
+		candidatos = set(listas[ordem[0]])
+		for i in ordem[1:]:
+			candidatos.intersection_update(listas[i])
+			if not candidatos:
+				return []
+
+		for frase in frases:
+			candidatos = self._filtrar_frase(candidatos, frase)
+
+		pontos = Counter()
+		for termo, lista in zip(termos, listas):
+			peso = self.idf(termo)
+			for versiculo_id in lista:
+				if versiculo_id in candidatos:
+					pontos[versiculo_id] += peso
+
+		return sorted(
+			candidatos,
+			key=lambda v: (-pontos[v] / math.sqrt(self.tamanhos[v] or 1), v)
+		)
+
+	def _filtrar_frase(self, candidatos: set[int], frase: list[str]) -> set[int]:
+		"""Candidatos onde as palavras da frase aparecem em posições seguidas."""
+		inicios: dict[int, set[int]] = {}
+		for v, p in zip(self.postings[frase[0]], self.posicoes[frase[0]]):
+			if v in candidatos:
+				inicios.setdefault(v, set()).add(p)
+
+		for deslocamento, termo in enumerate(frase[1:], start=1):
+			seguintes: dict[int, set[int]] = {}
+			for v, p in zip(self.postings[termo], self.posicoes[termo]):
+				if v in inicios and p - deslocamento in inicios[v]:
+					seguintes.setdefault(v, set()).add(p - deslocamento)
+			inicios = seguintes
+
+		return set(inicios)
+
+_indice: IndiceBiblia | None = None
+_busca: IndiceBusca | None = None
+# Os dois são montados em threads (`asyncio.to_thread`); as travas garantem que
+# chamadas simultâneas esperem a mesma montagem em vez de repeti-la.
+_trava_indice = threading.Lock()
+_trava_busca = threading.Lock()
+
+def get_biblia() -> IndiceBiblia:
+	"""Retorna o índice da Bíblia, carregando-o só na primeira chamada."""
+	global _indice
+	if _indice is None:
+		with _trava_indice:
+			if _indice is None:
+				_indice = carregar_indice()
+	return _indice
+
+def get_busca() -> IndiceBusca:
+	"""Retorna o índice de busca, montado na primeira consulta."""
+	global _busca
+	if _busca is None:
+		with _trava_busca:
+			if _busca is None:
+				_busca = IndiceBusca(get_biblia())
+	return _busca
+
+if __name__ == "__main__":
+	carregar_indice(reconstruir=True)
@@ -1,12 +1,29 @@
 import aiohttp
 import asyncio
+import bisect
 import discord
+import hashlib
 import os
 import re
+import sys
+import time
 
 from bs4 import BeautifulSoup
+from collections import OrderedDict
 from discord import ui
-from typing import TypedDict, Optional
+from typing import Iterable, Iterator, TypedDict, Optional
+
+from .data import DataFiles, SERIALIZADOR, escrever_atomico, abrir_json
+
+try:
+	from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+	LexborHTMLParser = None
+
+try:
+	import lxml
+except ImportError:
+	lxml = None
 
 class PaginaDict(TypedDict):
 	titulo: Optional[str]
@@ -31,6 +48,34 @@ class PaginasDict(TypedDict):
 	t_parte: ParteDict
 	q_parte: ParteDict
 
+class ParagrafoDict(TypedDict):
+	texto: str
+	parte: int
+	secao: int
+	capitulo: Optional[int]
+	titulo: str
+
+class PaginaCacheDict(TypedDict):
+	url: str
+	etag: Optional[str]
+	last_modified: Optional[str]
+	verificado_em: float
+	html: str
+
+class BlocoDict(TypedDict):
+	p_init: int
+	p_end: int
+	parte: int
+	secao: int
+	capitulo: Optional[int]
+	url: str
+	titulo: str
+
+class CatecismoDict(TypedDict):
+	versao: int
+	gerado_em: int
+	paragrafos: dict[str, ParagrafoDict]
+
 PAGINAS: PaginasDict = {
 	"prologo": {
 		"titulo": "Prólogo",
@@ -246,7 +291,45 @@ URLS = {
 }
 
 
+TOTAL_PARAGRAFOS = PAGINAS["q_parte"]["ss"]["p_end"]
+VERSAO_CATECISMO = 1
+
+CACHE_PAGINAS = os.path.join(os.path.dirname(DataFiles.CATECISMO.value), "cache_catecismo")
+CACHE_PAGINAS_TTL = 7 * 24 * 3600
+PAGINAS_EM_MEMORIA = 16
+DOWNLOADS_SIMULTANEOS = 4
+
+PALAVRAS_ATUALIZADAS = {
+	"secção": "seção",
+	"actor": "ator",
+	"actos": "atos"
+}
+
+def _montar_substituicoes() -> dict[str, str]:
+	substituicoes = {"«": '"', "»": '"'}
+	for antiga, nova in PALAVRAS_ATUALIZADAS.items():
+		substituicoes[antiga] = nova
+		substituicoes[antiga.capitalize()] = nova.capitalize()
+		substituicoes[antiga.upper()] = nova.upper()
+	return substituicoes
+
+SUBSTITUICOES = _montar_substituicoes()
+PADRAO_SUBSTITUICOES = re.compile("|".join(
+	re.escape(antiga) for antiga in sorted(SUBSTITUICOES, key=len, reverse=True)
+))
+
+if LexborHTMLParser is not None:
+	PARSER_HTML = "selectolax"
+elif lxml is not None:
+	PARSER_HTML = "lxml"
+else:
+	PARSER_HTML = "html.parser"
+
 session: aiohttp.ClientSession | None = None
+_catecismo: dict[int, ParagrafoDict] | None = None
+_paginas: OrderedDict[str, tuple[float, dict[int, str]]] = OrderedDict()
+_downloads = asyncio.Semaphore(DOWNLOADS_SIMULTANEOS)
+_em_andamento: dict[str, asyncio.Task] = {}
 
 
 def get_url(parte: int, secao: int, capitulo: int | None = None):
@@ -262,17 +345,17 @@ def get_url(parte: int, secao: int, capitulo: int | None = None):
 	return url, titulo
 
 
-def descobrir_bloco(n: int):
+def _listar_blocos():
+	"""Percorre `PAGINAS` e gera cada bloco de parágrafos com a sua página."""
 	prologo = PAGINAS["prologo"]
-	if prologo["p_init"] <= n <= prologo["p_end"]:
-		return 0, 0, None
+	yield prologo["p_init"], prologo["p_end"], 0, 0, None
 
 	for i, chave in enumerate(["p_parte", "s_parte", "t_parte", "q_parte"], start=1):
 		parte = PAGINAS[chave]
 
 		intro = parte.get("introducao")
-		if intro and intro["p_init"] <= n <= intro["p_end"]:
-			return i, 0, None
+		if intro:
+			yield intro["p_init"], intro["p_end"], i, 0, None
 
 		for secao_idx, secao_key in enumerate(["ps", "ss"], start=1):
 			secao = parte.get(secao_key)
@@ -280,55 +363,177 @@ def descobrir_bloco(n: int):
 				continue
 
 			if secao.get("p_init") and secao.get("p_end"):
-				if secao["p_init"] <= n <= secao["p_end"]:
-					return i, secao_idx, None
+				yield secao["p_init"], secao["p_end"], i, secao_idx, None
 
 			for cap_idx, cap in enumerate(secao.get("capitulos") or [], start=1):
-				if cap["p_init"] <= n <= cap["p_end"]:
-					return i, secao_idx, cap_idx
+				yield cap["p_init"], cap["p_end"], i, secao_idx, cap_idx
+
+def _montar_blocos() -> list[BlocoDict]:
+	blocos: list[BlocoDict] = []
+	for p_init, p_end, parte, secao, capitulo in _listar_blocos():
+		url, titulo = get_url(parte, secao, capitulo)
+		blocos.append({
+			"p_init": p_init,
+			"p_end": p_end,
+			"parte": parte,
+			"secao": secao,
+			"capitulo": capitulo,
+			"url": url,
+			"titulo": titulo
+		})
+
+	blocos.sort(key=lambda bloco: bloco["p_init"])
+	for anterior, bloco in zip(blocos, blocos[1:]):
+		if anterior["p_end"] >= bloco["p_init"]:
+			raise ValueError(f"Blocos sobrepostos em PAGINAS: §{anterior['p_init']}-{anterior['p_end']} e §{bloco['p_init']}-{bloco['p_end']}")
+	return blocos
+
+BLOCOS = _montar_blocos()
+INICIOS_BLOCOS = [bloco["p_init"] for bloco in BLOCOS]
+
+def bloco_do_paragrafo(n: int) -> BlocoDict | None:
+	i = bisect.bisect_right(INICIOS_BLOCOS, n) - 1
+	if i >= 0 and n <= BLOCOS[i]["p_end"]:
+		return BLOCOS[i]
+	return None
 
-	return None, None, None
+def descobrir_bloco(n: int):
+	bloco = bloco_do_paragrafo(n)
+	if bloco is None:
+		return None, None, None
+	return bloco["parte"], bloco["secao"], bloco["capitulo"]
+
+def blocos_do_intervalo(p_init: int, p_end: int) -> Iterator[tuple[BlocoDict, int, int]]:
+	"""
+	Divide `p_init`..`p_end` nos trechos de cada bloco, como (bloco, início,
+	fim). Parágrafos fora de qualquer bloco ficam de fora.
+	"""
+	i = max(bisect.bisect_right(INICIOS_BLOCOS, p_init) - 1, 0)
+	while i < len(BLOCOS) and BLOCOS[i]["p_init"] <= p_end:
+		bloco = BLOCOS[i]
+		inicio = max(p_init, bloco["p_init"])
+		fim = min(p_end, bloco["p_end"])
+		if inicio <= fim:
+			yield bloco, inicio, fim
+		i += 1
+
+def carregar_catecismo(arquivo: str = DataFiles.CATECISMO.value) -> dict[int, ParagrafoDict]:
+	"""
+	Lê os parágrafos salvos por `construir_catecismo`. Retorna vazio se o
+	arquivo não existe ou é de outra versão.
+	"""
+	dados: CatecismoDict = abrir_json(arquivo)
+	if not dados:
+		print(f"[CATECISMO] {arquivo} não encontrado; os parágrafos serão baixados do site do Vaticano. Gere com `python -m utils.catecismo construir`.")
+		return {}
+
+	if dados.get("versao") != VERSAO_CATECISMO:
+		print(f"[CATECISMO] {arquivo} é da versão {dados.get('versao')}, esperada {VERSAO_CATECISMO}. Refaça com `python -m utils.catecismo construir`.")
+		return {}
+
+	return {int(n): paragrafo for n, paragrafo in dados["paragrafos"].items()}
+
+def get_catecismo() -> dict[int, ParagrafoDict]:
+	"""Retorna os parágrafos do arquivo local, lendo-o só na primeira chamada."""
+	global _catecismo
+	if _catecismo is None:
+		_catecismo = carregar_catecismo()
+	return _catecismo
+
+async def construir_catecismo(arquivo: str = DataFiles.CATECISMO.value) -> int:
+	"""
+	Baixa cada página de `URLS` uma vez e grava todos os parágrafos, com parte,
+	seção, capítulo e título, em `arquivo`. Retorna quantos parágrafos foram salvos.
+	"""
+	global _catecismo
+
+	paginas = await baixar_paginas(
+		url for secoes in URLS.values() for capitulos in secoes.values() for url in capitulos.values()
+	)
+	for url, pars in paginas.items():
+		print(f"[CATECISMO] {url.split('/')[-1]}: {len(pars)} parágrafos")
+
+	paragrafos: dict[str, ParagrafoDict] = {}
+	for bloco, inicio, fim in blocos_do_intervalo(1, TOTAL_PARAGRAFOS):
+		pagina = paginas[bloco["url"]]
+		for n in range(inicio, fim + 1):
+			if n not in pagina:
+				continue
 
-async def extrair_intervalo(p_init: int, p_end: int):
+			paragrafos[str(n)] = {
+				"texto": pagina[n],
+				"parte": bloco["parte"],
+				"secao": bloco["secao"],
+				"capitulo": bloco["capitulo"],
+				"titulo": bloco["titulo"]
+			}
+
+	if len(paragrafos) != TOTAL_PARAGRAFOS:
+		print(f"[CATECISMO] Atenção: {TOTAL_PARAGRAFOS - len(paragrafos)} parágrafos não foram encontrados.")
+
+	catecismo: CatecismoDict = {
+		"versao": VERSAO_CATECISMO,
+		"gerado_em": int(time.time()),
+		"paragrafos": paragrafos
+	}
+	escrever_atomico(arquivo, SERIALIZADOR.dumps(catecismo).encode("utf-8"))
+	print(f"[CATECISMO] {arquivo} gravado ({len(paragrafos)} parágrafos).")
+
+	_catecismo = None
+	return len(paragrafos)
+
+def intervalo_local(catecismo: dict[int, ParagrafoDict], p_init: int, p_end: int):
+	"""Mesmo resultado de `extrair_intervalo`, só com o arquivo local."""
 	textos = []
-	cache = {}
-	last_url = None
-	pars = {}
-	titulo = None
-	parte_base = None
-	secao_base = None
-	capitulo_base = None
-
-	for n in range(p_init, p_end + 1):
-		parte, secao, capitulo = descobrir_bloco(n)
-		if parte is None:
+	primeiro: ParagrafoDict | None = None
+
+	for n in range(max(p_init, 1), min(p_end, TOTAL_PARAGRAFOS) + 1):
+		paragrafo = catecismo.get(n)
+		if paragrafo is None:
 			continue
 
-		url, titulo_atual = get_url(parte, secao, capitulo)
+		if primeiro is None:
+			primeiro = paragrafo
+		textos.append(f"**§{n}.** {paragrafo['texto']}")
 
-		if parte_base is None:
-			parte_base = parte
-			secao_base = secao
-			capitulo_base = capitulo
-			titulo = titulo_atual
+	return {
+		"p_init": p_init,
+		"p_end": p_end,
+		"texto": textos,
+		"titulo": primeiro["titulo"] if primeiro else None,
+		"parte": primeiro["parte"] if primeiro else None,
+		"secao": primeiro["secao"] if primeiro else None,
+		"capitulo": primeiro["capitulo"] if primeiro else None
+	}
 
-		if url != last_url:
-			if url not in cache:
-				cache[url] = await baixar_e_extrair(url)
-			pars = cache[url]
-			last_url = url
+async def extrair_intervalo(p_init: int, p_end: int, paginas: dict[str, dict[int, str]] | None = None):
+	catecismo = get_catecismo()
+	if catecismo:
+		return intervalo_local(catecismo, p_init, p_end)
 
-		if n in pars:
-			textos.append(f"**§{n}.** {pars[n]}")
+	if paginas is None:
+		paginas = await baixar_paginas(bloco["url"] for bloco, _, _ in blocos_do_intervalo(p_init, p_end))
+
+	textos = []
+	primeiro: BlocoDict | None = None
+
+	for bloco, inicio, fim in blocos_do_intervalo(p_init, p_end):
+		if primeiro is None:
+			primeiro = bloco
+		pars = paginas[bloco["url"]]
+
+		for n in range(inicio, fim + 1):
+			if n in pars:
+				textos.append(f"**§{n}.** {pars[n]}")
 
 	return {
 		"p_init": p_init,
 		"p_end": p_end,
 		"texto": textos,
-		"titulo": titulo,
-		"parte": parte_base,
-		"secao": secao_base,
-		"capitulo": capitulo_base
+		"titulo": primeiro["titulo"] if primeiro else None,
+		"parte": primeiro["parte"] if primeiro else None,
+		"secao": primeiro["secao"] if primeiro else None,
+		"capitulo": primeiro["capitulo"] if primeiro else None
 	}
 
 async def extract_cic(texto: str):
@@ -337,25 +542,76 @@ async def extract_cic(texto: str):
 
 	pattern = r"(?:CIC\s*)?[§$]+\s*(\d+)(?:\s*-\s*(\d+))?"
 
+	intervalos = []
 	for texto in textos:
 		for match_ in re.finditer(pattern, texto.upper()):
 			p_init = int(match_.group(1))
 			p_end = int(match_.group(2)) if match_.group(2) else p_init
+			intervalos.append((p_init, p_end))
 
-			intervalo = await extrair_intervalo(p_init, p_end)
+	# Sem o arquivo local, baixa de uma vez todas as páginas que as citações usam.
+	paginas = None
+	if intervalos and not get_catecismo():
+		paginas = await baixar_paginas(
+			bloco["url"] for p_init, p_end in intervalos for bloco, _, _ in blocos_do_intervalo(p_init, p_end)
+		)
 
-			if intervalo["texto"]:
-				data.append(intervalo)
+	for p_init, p_end in intervalos:
+		intervalo = await extrair_intervalo(p_init, p_end, paginas)
+
+		if intervalo["texto"]:
+			data.append(intervalo)
 
 	return data
 	
-async def baixar_e_extrair(url: str):
-	async with session.get(url) as resp:
-		resp.raise_for_status()
-		html = await resp.text()
-		await resp.release()
+def _arquivo_pagina(url: str) -> str:
+	nome = hashlib.blake2b(url.encode("utf-8"), digest_size=8).hexdigest()
+	return os.path.join(CACHE_PAGINAS, f"{nome}.json")
+
+def _ler_pagina(url: str) -> PaginaCacheDict | None:
+	entrada = abrir_json(_arquivo_pagina(url))
+	if not entrada or entrada.get("url") != url:
+		return None
+	return entrada
+
+def _gravar_pagina(entrada: PaginaCacheDict):
+	try:
+		escrever_atomico(_arquivo_pagina(entrada["url"]), SERIALIZADOR.dumps(entrada).encode("utf-8"))
+	except OSError as e:
+		print(f"[CATECISMO] Não foi possível gravar o cache de {entrada['url']}: {e}")
+
+def _guardar_paragrafos(url: str, verificado_em: float, paragrafos: dict[int, str]):
+	_paginas[url] = (verificado_em, paragrafos)
+	_paginas.move_to_end(url)
+	while len(_paginas) > PAGINAS_EM_MEMORIA:
+		_paginas.popitem(last=False)
+
+def _limpar_paragrafo(texto: str) -> str:
+	"""Tira a pontuação que sobra do número e troca aspas e grafias antigas numa só passada."""
+	texto = texto.lstrip(".-–—:; ")
+	return PADRAO_SUBSTITUICOES.sub(lambda m: SUBSTITUICOES[m.group()], texto)
+
+def _extrair_com_selectolax(html: str) -> dict[int, str]:
+	paragrafos = {}
+
+	for p in LexborHTMLParser(html).css("p"):
+		b = p.css_first("b")
+		if b is None:
+			continue
 
-	soup = BeautifulSoup(html, "html.parser")
+		numero = b.text(strip=True).replace(".", "")
+		if not numero.isdigit():
+			continue
+
+		b.decompose()
+		# Igual ao get_text(" ", strip=True) do BeautifulSoup: pula os trechos vazios.
+		partes = p.text(deep=True, separator="\0", strip=True).split("\0")
+		paragrafos[int(numero)] = _limpar_paragrafo(" ".join(parte for parte in partes if parte))
+
+	return paragrafos
+
+def _extrair_com_bs4(html: str, parser: str) -> dict[int, str]:
+	soup = BeautifulSoup(html, parser)
 	paragrafos = {}
 
 	for p in soup.find_all("p"):
@@ -368,30 +624,112 @@ async def baixar_e_extrair(url: str):
 			continue
 
 		b.extract()
-		texto = p.get_text(" ", strip=True)
-		texto = texto.lstrip(".-–—:; ")
-		texto = texto.replace("«", '"').replace("»", '"')
-
-		palavras = {
-			"secção": "seção",
-			"actor": "ator",
-			"actos": "atos"
-		}
-
-		palavras_variacoes = {}
+		paragrafos[int(numero)] = _limpar_paragrafo(p.get_text(" ", strip=True))
 
-		for antiga, nova in palavras.items():
-			palavras_variacoes[antiga] = nova
-			palavras_variacoes[antiga.capitalize()] = nova.capitalize()
-			palavras_variacoes[antiga.upper()] = nova.upper()
-
-		for antiga, nova in palavras_variacoes.items():
-			texto = texto.replace(antiga, nova)
+	return paragrafos
 
-		paragrafos[int(numero)] = texto
+def extrair_paragrafos(html: str, parser: str = PARSER_HTML) -> dict[int, str]:
+	"""
+	Parágrafos numerados de uma página do Catecismo. Usa o `selectolax` ou o
+	`lxml` se estiverem instalados; senão, o `html.parser` padrão.
+	"""
+	if parser == "selectolax":
+		return _extrair_com_selectolax(html)
+	return _extrair_com_bs4(html, parser)
+
+async def baixar_e_extrair(url: str, ttl: float = CACHE_PAGINAS_TTL):
+	"""
+	Parágrafos de uma página do Catecismo. Usa primeiro os parágrafos em
+	memória, depois o HTML salvo em `CACHE_PAGINAS`; passado `ttl`, a página é
+	revalidada com `If-None-Match`/`If-Modified-Since` e só é baixada de novo
+	se mudou.
+	"""
+	agora = time.time()
+	em_memoria = _paginas.get(url)
+	if em_memoria is not None and agora - em_memoria[0] < ttl:
+		_paginas.move_to_end(url)
+		return em_memoria[1]
+
+	entrada = await asyncio.to_thread(_ler_pagina, url)
+	if entrada is not None and agora - entrada["verificado_em"] < ttl:
+		paragrafos = em_memoria[1] if em_memoria is not None else extrair_paragrafos(entrada["html"])
+		_guardar_paragrafos(url, entrada["verificado_em"], paragrafos)
+		return paragrafos
+
+	cabecalhos = {}
+	if entrada is not None:
+		if entrada["etag"]:
+			cabecalhos["If-None-Match"] = entrada["etag"]
+		if entrada["last_modified"]:
+			cabecalhos["If-Modified-Since"] = entrada["last_modified"]
+
+	try:
+		async with session.get(url, headers=cabecalhos) as resp:
+			if resp.status == 304 and entrada is not None:
+				html = None
+			else:
+				resp.raise_for_status()
+				html = await resp.text()
+			etag = resp.headers.get("ETag")
+			last_modified = resp.headers.get("Last-Modified")
+	except aiohttp.ClientError as e:
+		if entrada is None:
+			raise
+		# Melhor uma cópia antiga do que nenhuma; tenta revalidar na próxima.
+		print(f"[CATECISMO] Falha ao revalidar {url} ({e}); usando a cópia salva.")
+		paragrafos = em_memoria[1] if em_memoria is not None else extrair_paragrafos(entrada["html"])
+		_guardar_paragrafos(url, entrada["verificado_em"], paragrafos)
+		return paragrafos
+
+	if html is None:
+		entrada["verificado_em"] = agora
+		entrada["etag"] = etag or entrada["etag"]
+		entrada["last_modified"] = last_modified or entrada["last_modified"]
+		paragrafos = em_memoria[1] if em_memoria is not None else extrair_paragrafos(entrada["html"])
+	else:
+		entrada = {
+			"url": url,
+			"etag": etag,
+			"last_modified": last_modified,
+			"verificado_em": agora,
+			"html": html
+		}
+		paragrafos = extrair_paragrafos(html)
 
+	await asyncio.to_thread(_gravar_pagina, entrada)
+	_guardar_paragrafos(url, agora, paragrafos)
 	return paragrafos
 
+async def _baixar_limitado(url: str) -> dict[int, str]:
+	async with _downloads:
+		return await baixar_e_extrair(url)
+
+async def obter_pagina(url: str) -> dict[int, str]:
+	"""
+	Igual a `baixar_e_extrair`, mas quem pedir uma página que já está sendo
+	baixada espera o mesmo download, e no máximo `DOWNLOADS_SIMULTANEOS`
+	páginas são baixadas ao mesmo tempo.
+	"""
+	em_memoria = _paginas.get(url)
+	if em_memoria is not None and time.time() - em_memoria[0] < CACHE_PAGINAS_TTL:
+		_paginas.move_to_end(url)
+		return em_memoria[1]
+
+	tarefa = _em_andamento.get(url)
+	if tarefa is None:
+		tarefa = asyncio.create_task(_baixar_limitado(url))
+		_em_andamento[url] = tarefa
+		tarefa.add_done_callback(lambda _: _em_andamento.pop(url, None))
+
+	# O shield evita que um pedido cancelado cancele o download dos outros.
+	return await asyncio.shield(tarefa)
+
+async def baixar_paginas(urls: Iterable[str]) -> dict[str, dict[int, str]]:
+	"""Baixa as páginas em paralelo, cada URL uma vez só."""
+	urls = list(dict.fromkeys(urls))
+	resultados = await asyncio.gather(*(obter_pagina(url) for url in urls))
+	return dict(zip(urls, resultados))
+
 async def check_cic_verse(msg: discord.Message):
 	datas = await extract_cic(msg.content)
 	for data in datas:
@@ -489,5 +827,13 @@ async def close_session():
 	global session
 	await session.close()
 
+async def construir_pelo_terminal():
+	async with aiohttp.ClientSession() as nova_sessao:
+		load_session(nova_sessao)
+		await construir_catecismo()
+
 if __name__ == "__main__":
-	asyncio.run(check_all_urls(URLS))
\ No newline at end of file
+	if sys.argv[1:2] == ["construir"]:
+		asyncio.run(construir_pelo_terminal())
+	else:
+		asyncio.run(check_all_urls(URLS))
\ No newline at end of file
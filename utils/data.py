@@ -1,20 +1,45 @@
+import asyncio
+import csv
+import gzip
+import hashlib
+import io
 import os
 import json
+import queue
 import sqlite3
+import tempfile
+import threading
+import time
 
+from collections import OrderedDict
+from concurrent.futures import Future
 from enum import Enum
-from typing import TypedDict
+from typing import IO, Any, AsyncIterator, Callable, Literal, TypedDict
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+DATABASE = "database.db"
+FLUSH_INTERVALO = 30
+DEBOUNCE_ESCRITA = 0.5
+EXPORT_PAGINA = 500
+LOTE_MIGRACAO = 500
+CONTADORES_MEMBRO = ("palavroes",)
 
 class DataFiles(Enum):
 	CONFIG = 'data/config.json'
 	EMBEDS = 'data/embeds.json'
 	BIBLIA = 'data/biblia.json'
+	CATECISMO = 'data/catecismo.json'
 	CANONES = 'data/canones.json'
 	MEMBROS = 'data/membros.json'
 	NEWS_VA = 'data/news_va.json'
 	PALAVROES = 'data/badwords.txt'
 
 class WarnsJson(TypedDict):
+	id: int
 	dado_por: int
 	quando: int
 	motivo: str = ""
@@ -86,108 +111,603 @@ class Config(TypedDict):
 	calls: dict[str, CallDict]
 
 class MembrosJson(TypedDict):
-	warns: list[WarnsJson] = []
 	ja_boostou: bool = False
 	palavroes: int
 
-def get_connection():
-	conn = sqlite3.connect("database.db")
-	conn.row_factory = sqlite3.Row
-	return conn
+class Database:
+	"""
+	Conexão única e de longa duração com o banco SQLite.
+	Aberta uma vez pelo `DatabaseWorker` e usada apenas pela thread dele.
+	"""
+
+	PRAGMAS = (
+		"PRAGMA journal_mode=WAL",
+		"PRAGMA synchronous=NORMAL",
+		"PRAGMA foreign_keys=ON",
+		"PRAGMA busy_timeout=5000",
+		"PRAGMA temp_store=MEMORY",
+		"PRAGMA cache_size=-8000",
+	)
+
+	def __init__(self, caminho: str = DATABASE):
+		self.caminho = caminho
+		self.conn: sqlite3.Connection | None = None
+
+	def conectar(self) -> sqlite3.Connection:
+		if self.conn is None:
+			# O sqlite3 guarda em cache os statements já preparados por texto SQL,
+			# então as consultas abaixo são compiladas uma única vez por conexão.
+			conn = sqlite3.connect(self.caminho, cached_statements=256)
+			conn.row_factory = sqlite3.Row
+			for pragma in self.PRAGMAS:
+				conn.execute(pragma)
+			self.conn = conn
+		return self.conn
+
+	def fechar(self):
+		if self.conn is not None:
+			self.conn.close()
+			self.conn = None
+
+class DatabaseWorker(threading.Thread):
+	"""
+	Thread dedicada que é dona da conexão e executa, em ordem, os pedidos
+	colocados na fila. Assim o loop do Discord nunca espera pelo disco.
+	"""
+
+	def __init__(self, database: Database):
+		super().__init__(name="database", daemon=True)
+		self.database = database
+		self.fila: queue.SimpleQueue[tuple[Callable[..., Any], tuple, Future] | None] = queue.SimpleQueue()
+
+	def run(self):
+		conn = self.database.conectar()
+		try:
+			while True:
+				pedido = self.fila.get()
+				if pedido is None:
+					break
+
+				func, args, futuro = pedido
+				if not futuro.set_running_or_notify_cancel():
+					continue
+
+				try:
+					futuro.set_result(func(conn, *args))
+				except BaseException as e:
+					futuro.set_exception(e)
+		finally:
+			self.database.fechar()
+
+	def enviar(self, func: Callable[..., Any], *args) -> Future:
+		futuro = Future()
+		self.fila.put((func, args, futuro))
+		return futuro
+
+	def parar(self):
+		self.fila.put(None)
+		self.join()
+
+	def migrar(self, conn: sqlite3.Connection):
+		# Migrações em lotes voltam para o fim da fila entre um lote e outro,
+		# deixando os pedidos do bot serem atendidos no meio.
+		global _erro_migracao
+		try:
+			pendente = aplicar_migracoes(conn)
+		except Exception as e:
+			# Ninguém espera por este pedido; o erro fica guardado para as
+			# leituras de penitências, que falham em vez de sair parciais.
+			_erro_migracao = e
+			print(f"[DB] Erro ao aplicar migrações: {e!r}")
+			return
+
+		if pendente:
+			self.enviar(self.migrar)
+		else:
+			_warns_migrados.set()
+
+_worker: DatabaseWorker | None = None
+# Marcado quando a migração 3 termina. Antes disso, as penitências JSON de um
+# membro são copiadas na hora em que alguém as pede.
+_warns_migrados = threading.Event()
+_erro_migracao: Exception | None = None
+
+def _get_worker() -> DatabaseWorker:
+	global _worker
+	if _worker is None or not _worker.is_alive():
+		_worker = DatabaseWorker(Database())
+		_worker.start()
+		_worker.enviar(_worker.migrar)
+	return _worker
+
+async def executar(func: Callable[..., Any], *args) -> Any:
+	"""
+	Executa `func(conn, *args)` na thread do banco e aguarda o resultado
+	sem bloquear o loop de eventos.
+	"""
+	return await asyncio.wrap_future(_get_worker().enviar(func, *args))
+
+class SerializadorJson:
+	"""Backend padrão, usando o módulo `json` da biblioteca padrão."""
+
+	nome = "json"
+
+	def loads(self, bruto: bytes | str) -> Any:
+		return json.loads(bruto)
+
+	def dumps(self, conteudo: Any, indent: int | None = None) -> str:
+		return json.dumps(conteudo, ensure_ascii=False, indent=indent)
+
+class SerializadorOrjson(SerializadorJson):
+	"""
+	Backend com `orjson`, bem mais rápido para ler arquivos grandes como a
+	Bíblia. O orjson só indenta com 2 espaços, então arquivos salvos com
+	outra indentação continuam passando pelo `json` padrão.
+	"""
+
+	nome = "orjson"
+
+	def loads(self, bruto: bytes | str) -> Any:
+		return orjson.loads(bruto)
+
+	def dumps(self, conteudo: Any, indent: int | None = None) -> str:
+		if indent is None:
+			return orjson.dumps(conteudo).decode("utf-8")
+		if indent == 2:
+			return orjson.dumps(conteudo, option=orjson.OPT_INDENT_2).decode("utf-8")
+		return super().dumps(conteudo, indent)
+
+SERIALIZADOR: SerializadorJson = SerializadorOrjson() if orjson is not None else SerializadorJson()
 
 def abrir_json(arquivo: str) -> dict | list:
 	if os.path.isfile(arquivo):
-		with open(arquivo, "r", encoding="utf-8") as f:
-			return json.load(f)
+		with open(arquivo, "rb") as f:
+			return SERIALIZADOR.loads(f.read())
 
 	return {}
 
-def salvar_json(arquivo: str, conteudo: dict | list):
-	os.makedirs(os.path.dirname(arquivo), exist_ok=True)
-	with open(arquivo, "w", encoding="utf-8") as f:
-		json.dump(conteudo, f, ensure_ascii=False, indent=4)
+def _serializar_json(conteudo: dict | list) -> bytes:
+	return SERIALIZADOR.dumps(conteudo, indent=4).encode("utf-8")
+
+def _ler_umask() -> int:
+	# Lido uma vez, na importação: trocar a umask não é seguro com várias threads.
+	umask = os.umask(0)
+	os.umask(umask)
+	return umask
+
+UMASK = _ler_umask()
+
+def escrever_atomico(arquivo: str, bruto: bytes):
+	"""
+	Escreve num arquivo temporário ao lado e troca com `os.replace`, mantendo
+	as permissões do arquivo antigo (ou as padrão, se ele ainda não existe).
+	"""
+	pasta = os.path.dirname(arquivo) or "."
+	os.makedirs(pasta, exist_ok=True)
 
-def get_members() -> dict[str, MembrosJson]:
 	try:
-		conn = get_connection()
-		cursor = conn.cursor(dictionary=True)
-		cursor.execute("SELECT * FROM membros")
-		rows = cursor.fetchall()
-		membros = {}
-		for row in rows:
-			warns = row["warns"]
-			if warns is None:
-				warns = "[]"
-
-			membros[str(row["member_id"])] = {
-				"warns": json.loads(warns),
-				"ja_boostou": bool(row["ja_boostou"] if row["ja_boostou"] else 0),
-				"palavroes": int(row["palavroes"] if row["palavroes"] else 0)
-			}
-		return membros
-	finally:
-		cursor.close()
-		conn.close()
-
-def get_member(member_id: int) -> MembrosJson:
+		modo = os.stat(arquivo).st_mode & 0o7777
+	except FileNotFoundError:
+		modo = 0o666 & ~UMASK
+
+	fd, temporario = tempfile.mkstemp(dir=pasta, prefix=".tmp-", suffix=os.path.splitext(arquivo)[1])
 	try:
-		conn = get_connection()
-		cursor = conn.cursor()
-		cursor.execute("SELECT * FROM membros WHERE member_id = ?", (member_id,))
-		row = cursor.fetchone()
-		if not row:
-			return {"warns": [], "ja_boostou": False, "palavroes": 0}
-		
-		warns = row["warns"]
-		if warns is None:
-			warns = "[]"
-		return {
-			"warns": json.loads(warns),
-			"ja_boostou": bool(row["ja_boostou"] if row["ja_boostou"] else 0),
-			"palavroes": int(row["palavroes"] if row["palavroes"] else 0)
+		with os.fdopen(fd, "wb") as f:
+			f.write(bruto)
+			f.flush()
+			os.fsync(f.fileno())
+		# O mkstemp cria com 0600, e o os.replace manteria isso.
+		os.chmod(temporario, modo)
+		os.replace(temporario, arquivo)
+	except BaseException:
+		os.unlink(temporario)
+		raise
+
+def salvar_json(arquivo: str, conteudo: dict | list):
+	escrever_atomico(arquivo, _serializar_json(conteudo))
+
+def _membro_de_row(row: sqlite3.Row) -> MembrosJson:
+	return {
+		"ja_boostou": bool(row["ja_boostou"] if row["ja_boostou"] else 0),
+		"palavroes": int(row["palavroes"] if row["palavroes"] else 0)
+	}
+
+def _get_member(conn: sqlite3.Connection, member_id: int) -> MembrosJson:
+	row = conn.execute("SELECT * FROM membros WHERE member_id = ?", (member_id,)).fetchone()
+	membro = _membro_de_row(row) if row else {"ja_boostou": False, "palavroes": 0}
+	for campo, delta in _contadores_pendentes.get(member_id, {}).items():
+		membro[campo] += delta
+	return membro
+
+# Somas dos contadores de membros ainda não gravadas. Só a thread do banco
+# mexe aqui, então leituras, somas e flushes nunca se cruzam.
+_contadores_pendentes: dict[int, dict[str, int]] = {}
+
+def _somar_contador(conn: sqlite3.Connection, member_id: int, campo: str, delta: int) -> MembrosJson:
+	campos = _contadores_pendentes.setdefault(member_id, {})
+	campos[campo] = campos.get(campo, 0) + delta
+	return _get_member(conn, member_id)
+
+def _gravar_contadores(conn: sqlite3.Connection):
+	if not _contadores_pendentes:
+		return
+
+	deltas = dict(_contadores_pendentes)
+	with conn:
+		for campo in CONTADORES_MEMBRO:
+			params = [(member_id, campos[campo]) for member_id, campos in deltas.items() if campos.get(campo)]
+			if not params:
+				continue
+			conn.executemany(f"""
+				INSERT INTO membros (member_id, {campo})
+				VALUES (?, ?)
+				ON CONFLICT(member_id) DO UPDATE SET
+					{campo} = COALESCE({campo}, 0) + excluded.{campo}
+			""", params)
+
+	# Só depois do commit; se a transação falhar, as somas ficam para o próximo flush.
+	_contadores_pendentes.clear()
+
+async def flush_contadores():
+	"""Grava as somas pendentes de todos os membros numa só transação."""
+	await executar(_gravar_contadores)
+
+async def _flush_periodico():
+	while True:
+		await asyncio.sleep(FLUSH_INTERVALO)
+		try:
+			await flush_contadores()
+		except Exception as e:
+			print(f"[DB] Erro ao gravar contadores de membros: {e}")
+
+class MembrosCache:
+	"""
+	Cache de leitura dos membros, com despejo LRU. Os valores já incluem as
+	somas de contadores que ainda não foram gravadas.
+	"""
+
+	def __init__(self, capacidade: int = 2048):
+		self.capacidade = capacidade
+		self.membros: OrderedDict[int, MembrosJson] = OrderedDict()
+
+	def obter(self, member_id: int) -> MembrosJson | None:
+		membro = self.membros.get(member_id)
+		if membro is not None:
+			self.membros.move_to_end(member_id)
+		return membro
+
+	def guardar(self, member_id: int, membro: MembrosJson) -> MembrosJson:
+		self.membros[member_id] = membro
+		self.membros.move_to_end(member_id)
+		while len(self.membros) > self.capacidade:
+			self.membros.popitem(last=False)
+		return membro
+
+_membros_cache = MembrosCache()
+_flush_task: asyncio.Task | None = None
+
+def _pagina_membros(conn: sqlite3.Connection, depois_de: int, limite: int) -> list[dict]:
+	_garantir_warns_migrados_pagina(conn, depois_de, limite)
+	rows = conn.execute("""
+		SELECT
+			m.member_id,
+			m.ja_boostou,
+			m.palavroes,
+			(
+				SELECT json_group_array(json_object(
+					'id', w.id,
+					'dado_por', w.dado_por,
+					'quando', w.quando,
+					'motivo', w.motivo,
+					'remocao', json(CASE WHEN w.remocao THEN 'true' ELSE 'false' END)
+				))
+				FROM warns w
+				WHERE w.member_id = m.member_id AND w.ativo
+			) AS warns
+		FROM membros m
+		WHERE m.member_id > ?
+		ORDER BY m.member_id
+		LIMIT ?
+	""", (depois_de, limite))
+	return [
+		{
+			"member_id": row["member_id"],
+			"ja_boostou": bool(row["ja_boostou"]),
+			"palavroes": int(row["palavroes"] or 0),
+			"warns": row["warns"]
 		}
-	finally:
-		cursor.close()
-		conn.close()
+		for row in rows
+	]
+
+async def iterar_membros(pagina: int = EXPORT_PAGINA) -> AsyncIterator[dict]:
+	"""
+	Percorre a tabela de membros em páginas (keyset pelo `member_id`).
+	Cada página é um pedido separado à thread do banco, então o resto do
+	bot continua sendo atendido durante a exportação.
+	"""
+	await flush_contadores()
+	ultimo = -1
+	while True:
+		rows = await executar(_pagina_membros, ultimo, pagina)
+		if not rows:
+			return
 
-def save_member(member_id: int, obj: MembrosJson):
-	try:
-		conn = get_connection()
-		cursor = conn.cursor()
-		warns_json = json.dumps(obj.get("warns", []))
-		ja_boostou = int(obj.get("ja_boostou", False))
-		palavroes = int(obj.get("palavroes", 0))
-		
-		cursor.execute("""
-			INSERT INTO membros (member_id, warns, ja_boostou, palavroes)
-			VALUES (?, ?, ?, ?)
-			ON CONFLICT(member_id) DO UPDATE SET
-				warns=excluded.warns,
-				ja_boostou=excluded.ja_boostou,
-				palavroes=excluded.palavroes
-		""", (member_id, warns_json, ja_boostou, palavroes))
-		conn.commit()
-	finally:
-		cursor.close()
-		conn.close()
+		for row in rows:
+			yield row
+		ultimo = rows[-1]["member_id"]
+
+async def exportar_membros(formato: Literal["jsonl", "csv"] = "jsonl") -> tuple[IO[bytes], int]:
+	"""
+	Exporta os membros em JSON Lines ou CSV, comprimido com gzip, para um
+	arquivo temporário (em memória até 8 MB, depois em disco).
+	Retorna o arquivo já posicionado no início e a quantidade de linhas.
+	"""
+	arquivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+	total = 0
+
+	with gzip.GzipFile(fileobj=arquivo, mode="wb") as gz:
+		texto = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+		escritor = csv.writer(texto) if formato == "csv" else None
+		if escritor:
+			escritor.writerow(["member_id", "ja_boostou", "palavroes", "warns"])
+
+		async for membro in iterar_membros():
+			if escritor:
+				escritor.writerow([membro["member_id"], int(membro["ja_boostou"]), membro["palavroes"], membro["warns"]])
+			else:
+				membro["warns"] = SERIALIZADOR.loads(membro["warns"])
+				texto.write(SERIALIZADOR.dumps(membro))
+				texto.write("\n")
+			total += 1
+
+		texto.flush()
+		texto.detach()
+
+	arquivo.seek(0)
+	return arquivo, total
+
+async def get_member(member_id: int) -> MembrosJson:
+	membro = _membros_cache.obter(member_id)
+	if membro is not None:
+		return membro
+
+	carregado = await executar(_get_member, member_id)
+
+	# Outra corrotina pode ter carregado (e alterado) o membro enquanto esperávamos.
+	membro = _membros_cache.obter(member_id)
+	if membro is not None:
+		return membro
+	return _membros_cache.guardar(member_id, carregado)
+
+async def increment_member_counter(member_id: int, campo: str, delta: int = 1) -> int:
+	"""
+	Soma `delta` a um contador do membro e retorna o novo valor. A soma fica
+	em memória e vai para o banco no próximo `flush_contadores()`, junto com
+	as dos outros membros.
+	"""
+	if campo not in CONTADORES_MEMBRO:
+		raise ValueError(f"Contador de membro inválido: {campo}")
+
+	# As respostas da thread do banco chegam na ordem em que ela as executou,
+	# então este valor é sempre o mais novo que o cache já viu.
+	membro = await executar(_somar_contador, member_id, campo, delta)
+	_membros_cache.guardar(member_id, membro)
+	return membro[campo]
+
+def _warn_de_row(row: sqlite3.Row) -> WarnsJson:
+	return {
+		"id": row["id"],
+		"dado_por": row["dado_por"],
+		"quando": row["quando"],
+		"motivo": row["motivo"],
+		"remocao": bool(row["remocao"])
+	}
+
+def _copiar_warns_json(conn: sqlite3.Connection, member_id: int, warns: str | None):
+	for w in json.loads(warns or "[]"):
+		conn.execute(
+			"INSERT INTO warns (member_id, dado_por, quando, motivo, remocao) VALUES (?, ?, ?, ?, ?)",
+			(member_id, w["dado_por"], w["quando"], w.get("motivo", ""), int(w.get("remocao", False)))
+		)
+	conn.execute("UPDATE membros SET warns = NULL WHERE member_id = ?", (member_id,))
+
+def _garantir_migracoes_ok():
+	if _erro_migracao is not None:
+		raise RuntimeError("As migrações do banco falharam; as penitências podem estar incompletas.") from _erro_migracao
+
+def _garantir_warns_migrados(conn: sqlite3.Connection, member_id: int):
+	"""
+	Enquanto a migração 3 ainda corre em lotes, copia antes as penitências
+	JSON do membro pedido, para que contagens e listas nunca saiam parciais.
+	"""
+	_garantir_migracoes_ok()
+	if _warns_migrados.is_set():
+		return
+
+	row = conn.execute("SELECT warns FROM membros WHERE member_id = ? AND warns IS NOT NULL", (member_id,)).fetchone()
+	if row is None:
+		return
+
+	with conn:
+		_copiar_warns_json(conn, member_id, row["warns"])
+
+def _garantir_warns_migrados_pagina(conn: sqlite3.Connection, depois_de: int, limite: int):
+	"""Igual a `_garantir_warns_migrados`, para uma página inteira da exportação."""
+	_garantir_migracoes_ok()
+	if _warns_migrados.is_set():
+		return
+
+	rows = conn.execute("""
+		SELECT member_id, warns FROM membros
+		WHERE member_id > ?
+		ORDER BY member_id
+		LIMIT ?
+	""", (depois_de, limite)).fetchall()
+
+	with conn:
+		for row in rows:
+			if row["warns"] is not None:
+				_copiar_warns_json(conn, row["member_id"], row["warns"])
+
+def _add_warn(conn: sqlite3.Connection, member_id: int, dado_por: int, motivo: str, quando: float) -> int:
+	_garantir_warns_migrados(conn, member_id)
+	with conn:
+		conn.execute("INSERT OR IGNORE INTO membros (member_id) VALUES (?)", (member_id,))
+		conn.execute(
+			"INSERT INTO warns (member_id, dado_por, quando, motivo) VALUES (?, ?, ?, ?)",
+			(member_id, dado_por, quando, motivo)
+		)
+	return _count_warns(conn, member_id)
+
+def _count_warns(conn: sqlite3.Connection, member_id: int) -> int:
+	_garantir_warns_migrados(conn, member_id)
+	row = conn.execute("SELECT COUNT(*) FROM warns WHERE member_id = ? AND ativo", (member_id,)).fetchone()
+	return row[0]
+
+def _get_warns(conn: sqlite3.Connection, member_id: int, limite: int, offset: int) -> list[WarnsJson]:
+	_garantir_warns_migrados(conn, member_id)
+	rows = conn.execute("""
+		SELECT * FROM warns
+		WHERE member_id = ? AND ativo
+		ORDER BY quando
+		LIMIT ? OFFSET ?
+	""", (member_id, limite, offset))
+	return [_warn_de_row(row) for row in rows]
+
+def _remove_warn(conn: sqlite3.Connection, warn_id: int, member_id: int) -> WarnsJson | None:
+	_garantir_warns_migrados(conn, member_id)
+	with conn:
+		row = conn.execute("""
+			UPDATE warns SET ativo = FALSE
+			WHERE id = ? AND member_id = ? AND ativo
+			RETURNING *
+		""", (warn_id, member_id)).fetchone()
+	return _warn_de_row(row) if row else None
+
+async def add_warn(member_id: int, dado_por: int, motivo: str, quando: float) -> int:
+	"""Registra uma penitência e retorna quantas o membro tem ativas."""
+	return await executar(_add_warn, member_id, dado_por, motivo, quando)
+
+async def count_warns(member_id: int) -> int:
+	return await executar(_count_warns, member_id)
+
+async def get_warns(member_id: int, limite: int = -1, offset: int = 0) -> list[WarnsJson]:
+	"""Penitências ativas do membro, da mais antiga para a mais recente."""
+	return await executar(_get_warns, member_id, limite, offset)
+
+async def remove_warn(warn_id: int, member_id: int) -> WarnsJson | None:
+	"""Desativa a penitência. Retorna None se ela já tinha sido removida."""
+	return await executar(_remove_warn, warn_id, member_id)
+
+class JsonCache:
+	"""
+	Snapshot em memória de um arquivo JSON. O arquivo só é relido quando
+	o mtime/tamanho muda, e só é reparseado se o conteúdo também mudou.
+
+	As gravações passam por `salvar()`: o snapshot é atualizado na hora e uma
+	única tarefa escreve o arquivo, juntando alterações seguidas numa escrita.
+
+	O objeto retornado é compartilhado: quem alterá-lo deve salvar em seguida.
+	"""
+
+	def __init__(self, arquivo: str):
+		self.arquivo = arquivo
+		self.dados: dict | list | None = None
+		self.assinatura: tuple[int, int] | None = None
+		self.hash: bytes | None = None
+		self.versao = 0
+		self.versao_gravada = 0
+		self.escritor: asyncio.Task | None = None
+
+	def obter(self) -> dict | list:
+		# Com uma escrita pendente, o snapshot é mais novo que o disco.
+		if self.dados is not None and self.versao != self.versao_gravada:
+			return self.dados
+
+		try:
+			st = os.stat(self.arquivo)
+		except FileNotFoundError:
+			return {}
+
+		assinatura = (st.st_mtime_ns, st.st_size)
+		if self.dados is not None and assinatura == self.assinatura:
+			return self.dados
+
+		with open(self.arquivo, "rb") as f:
+			bruto = f.read()
+
+		digest = hashlib.blake2b(bruto, digest_size=16).digest()
+		if self.dados is None or digest != self.hash:
+			self.dados = SERIALIZADOR.loads(bruto)
+			self.hash = digest
+			self.versao += 1
+			self.versao_gravada = self.versao
+
+		self.assinatura = assinatura
+		return self.dados
+
+	def invalidar(self):
+		self.dados = None
+		self.assinatura = None
+
+	def salvar(self, dados: dict | list):
+		self.dados = dados
+		self.versao += 1
+
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			self._gravar(_serializar_json(dados), self.versao)
+			return
+
+		if self.escritor is None or self.escritor.done():
+			self.escritor = loop.create_task(self._escrever())
+
+	async def _escrever(self):
+		while self.versao != self.versao_gravada:
+			await asyncio.sleep(DEBOUNCE_ESCRITA)
+			versao = self.versao
+			bruto = _serializar_json(self.dados)
+			await asyncio.to_thread(self._gravar, bruto, versao)
+
+	def _gravar(self, bruto: bytes, versao: int):
+		escrever_atomico(self.arquivo, bruto)
+		st = os.stat(self.arquivo)
+		self.assinatura = (st.st_mtime_ns, st.st_size)
+		self.hash = hashlib.blake2b(bruto, digest_size=16).digest()
+		self.versao_gravada = versao
+
+	async def flush(self):
+		if self.escritor is not None and not self.escritor.done():
+			await self.escritor
+
+_config_cache = JsonCache(DataFiles.CONFIG.value)
+_canones_cache = JsonCache(DataFiles.CANONES.value)
+
+async def flush_arquivos():
+	await _config_cache.flush()
+	await _canones_cache.flush()
 
 def get_embeds() -> dict[str, EmbedData | list[EmbedData]]:
 	return abrir_json(DataFiles.EMBEDS.value)
 
 def get_config() -> Config:
-	return abrir_json(DataFiles.CONFIG.value)
+	return _config_cache.obter()
 
 def save_config(config: Config):
-	salvar_json(DataFiles.CONFIG.value, config)
+	_config_cache.salvar(config)
+
+def get_canones() -> dict[str, list]:
+	return _canones_cache.obter()
+
+def save_canones(canones: dict[str, list]):
+	_canones_cache.salvar(canones)
 
 def carregar_biblia() -> BibliaDict:
 	return abrir_json(DataFiles.BIBLIA.value)
 
-def create_tables():
-	conn = get_connection()
-	cursor = conn.cursor()
-	
-	cursor.execute("""
+def _m001_tabelas_iniciais(conn: sqlite3.Connection):
+	conn.execute("""
 		CREATE TABLE IF NOT EXISTS membros (
 			member_id BIGINT PRIMARY KEY,
 			warns JSON,
@@ -196,7 +716,7 @@ def create_tables():
 		)
 	""")
 
-	cursor.execute("""
+	conn.execute("""
 		CREATE TABLE IF NOT EXISTS vatican_news_config (
 			guild_id BIGINT PRIMARY KEY,
 			ping BIGINT NULL,
@@ -205,10 +725,108 @@ def create_tables():
 			ultimo_guid TEXT NULL
 		)
 	""")
-	
-	conn.commit()
-	cursor.close()
-	conn.close()
+
+def _m002_tabela_warns(conn: sqlite3.Connection):
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS warns (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			member_id BIGINT NOT NULL,
+			dado_por BIGINT NOT NULL,
+			quando REAL NOT NULL,
+			motivo TEXT NOT NULL DEFAULT '',
+			remocao BOOLEAN NOT NULL DEFAULT FALSE,
+			ativo BOOLEAN NOT NULL DEFAULT TRUE
+		)
+	""")
+	conn.execute("CREATE INDEX IF NOT EXISTS idx_warns_member_quando ON warns (member_id, quando)")
+	conn.execute("CREATE INDEX IF NOT EXISTS idx_warns_dado_por ON warns (dado_por)")
+
+def _m003_warns_json_para_tabela(conn: sqlite3.Connection) -> bool:
+	"""
+	Move as penitências da antiga coluna JSON `membros.warns` para a tabela
+	`warns`, `LOTE_MIGRACAO` membros por vez.
+	"""
+	rows = conn.execute(
+		"SELECT member_id, warns FROM membros WHERE warns IS NOT NULL LIMIT ?",
+		(LOTE_MIGRACAO,)
+	).fetchall()
+
+	for row in rows:
+		_copiar_warns_json(conn, row["member_id"], row["warns"])
+
+	return len(rows) < LOTE_MIGRACAO
+
+# Passos em ordem. Um passo que retorna False ainda não terminou e será
+# chamado de novo; qualquer outro retorno conta como concluído.
+MIGRACOES: list[tuple[int, str, Callable[[sqlite3.Connection], bool | None]]] = [
+	(1, "Tabelas iniciais", _m001_tabelas_iniciais),
+	(2, "Tabela de penitências", _m002_tabela_warns),
+	(3, "Penitências do JSON para a tabela", _m003_warns_json_para_tabela),
+]
+
+def versao_schema(conn: sqlite3.Connection) -> int:
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS schema_version (
+			versao INTEGER PRIMARY KEY,
+			descricao TEXT NOT NULL,
+			aplicada_em REAL NOT NULL
+		)
+	""")
+	row = conn.execute("SELECT MAX(versao) FROM schema_version").fetchone()
+	return row[0] or 0
+
+def aplicar_migracoes(conn: sqlite3.Connection) -> bool:
+	"""
+	Aplica as migrações pendentes, cada passo (ou lote) na sua transação.
+	Retorna True se parou no meio de um passo em lotes e precisa ser chamada de novo.
+	"""
+	atual = versao_schema(conn)
+
+	for versao, descricao, passo in MIGRACOES:
+		if versao <= atual:
+			continue
+
+		conn.execute("BEGIN")
+		try:
+			concluido = passo(conn) is not False
+			if concluido:
+				conn.execute(
+					"INSERT INTO schema_version (versao, descricao, aplicada_em) VALUES (?, ?, ?)",
+					(versao, descricao, time.time())
+				)
+			conn.commit()
+		except BaseException:
+			conn.rollback()
+			raise
+
+		if not concluido:
+			return True
+		print(f"[DB] Migração {versao} aplicada: {descricao}")
+
+	return False
 
 def setup_database():
-	create_tables()
\ No newline at end of file
+	global _flush_task
+	_get_worker()
+
+	try:
+		loop = asyncio.get_running_loop()
+	except RuntimeError:
+		return
+
+	if _flush_task is None or _flush_task.done():
+		_flush_task = loop.create_task(_flush_periodico())
+
+async def fechar_database():
+	global _worker, _flush_task
+	if _flush_task is not None:
+		_flush_task.cancel()
+		_flush_task = None
+
+	if _worker is not None and _worker.is_alive():
+		try:
+			await flush_contadores()
+		except Exception as e:
+			print(f"[DB] Erro ao gravar contadores de membros: {e}")
+		await asyncio.to_thread(_worker.parar)
+	_worker = None
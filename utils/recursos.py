@@ -1,15 +1,22 @@
+import asyncio
 import datetime
 import discord
+import functools
 import os
 import re
+import time
 
 from bs4 import BeautifulSoup
+from collections import OrderedDict, deque
 from discord.ext import commands
-from typing import TypedDict
+from typing import Iterator, TypedDict
 
+from .biblia import LivroBiblia, get_biblia
+from .catecismo import get_catecismo
 from .console import is_unix
-from .data import Config, get_config, carregar_biblia, setup_database
+from .data import Config, get_config, setup_database, fechar_database, flush_arquivos
 from .errors import setup_error_manager
+from .texto import TABELA_ACENTOS, ArvoreBK, dobrar_acentos
 
 
 class BibleDict(TypedDict):
@@ -17,6 +24,7 @@ class BibleDict(TypedDict):
 	livro: str
 	capítulo: int
 	versículo_inicial: int
+	capítulo_final: int
 	versículo_final: int
 	texto: list[str]
 	tipo: str
@@ -206,10 +214,16 @@ def gerar_variacoes(nome):
 
 	n = {"I": 1, "II": 2, "III": 3}[romano]
 
-	variacoes = [nome, f"{n} {base}"]
+	# "I São Pedro" também é citado como "1 Pedro", "I Pedro"...
+	bases = [base]
+	if base.startswith("São "):
+		bases.append(base.removeprefix("São "))
 
-	for forma in ORDINAIS[n]:
-		variacoes.append(f"{forma} {base}")
+	variacoes = [nome]
+	for b in bases:
+		variacoes += [f"{romano} {b}", f"{n} {b}"]
+		for forma in ORDINAIS[n]:
+			variacoes.append(f"{forma} {b}")
 
 	return variacoes
 
@@ -224,6 +238,13 @@ def montar_livros_map():
 			variacoes.add(nome)
 			variacoes.add(info["abrev"])
 
+			# "1Cor" também aparece como "1 Cor" e "I Cor".
+			numerada = re.match(r"^([1-3])(\D.*)", info["abrev"])
+			if numerada:
+				n, resto = numerada.groups()
+				variacoes.add(f"{n} {resto}")
+				variacoes.add(f"{ROMANOS[int(n)]} {resto}")
+
 			for v in gerar_variacoes(nome):
 				variacoes.add(v)
 
@@ -243,99 +264,561 @@ def montar_livros_map():
 
 LIVROS_MAP = montar_livros_map()
 
+ESPACOS = re.compile(r"\s+")
 
-def gerar_info(biblia, livro_meta, cap, v1, v2):
 
-	livro_nome = livro_meta["livro"]
+def _chave_livro(nome: str) -> str:
+	return ESPACOS.sub("", dobrar_acentos(nome))
 
-	for livro in biblia[livro_meta["testamento"]]:
-		if livro["nome"].lower() == livro_nome.lower():
-			versos = livro["capitulos"][cap - 1]["versiculos"][v1 - 1 : v2]
 
-			texto = [f"**{v['versiculo']}.** {v['texto']}" for v in versos]
+def _montar_livros_dobrados(chave) -> dict[str, dict]:
+	mapa = {}
 
-			return {
-				"testamento": livro_meta["testamento"],
-				"livro": livro_nome,
-				"capítulo": cap,
-				"versículo_inicial": v1,
-				"versículo_final": v2,
-				"texto": texto,
-				"tipo": livro_meta["tipo"],
-			}
+	# Apelidos já sem acento vêm primeiro: "jo" é São João, mesmo que "jó" dobrado também dê "jo".
+	for apelido in sorted(LIVROS_MAP, key=lambda a: dobrar_acentos(a) != a):
+		mapa.setdefault(chave(apelido), LIVROS_MAP[apelido])
 
+	return mapa
 
-def expand_bible_verse(content: str) -> list[BibleDict]:
 
-	data = []
+# Sem acentos nem espaços ("1corintios"), para o índice exato e a BK-tree.
+LIVROS_DOBRADOS = _montar_livros_dobrados(_chave_livro)
+ARVORE_LIVROS = ArvoreBK(LIVROS_DOBRADOS)
 
-	biblia = carregar_biblia()
 
-	pattern = (
-		r"^((?:[1-3]\s?)?"
-		r"[A-Za-zÀ-ÿ]+"
-		r"(?:\s+[A-Za-zÀ-ÿ]+)*)"
-		r"\s*(\d+[,:\dab\.-]*)$"
-	)
+NUMERAL_INICIO = re.compile(r"^(?:([1-3])\s*|(i{1,3})\s+)(?=\D)")
+NUMERAL_LIVRO = re.compile(r"^(I{1,3}) ")
+
+
+def _numeral(nome: str) -> int:
+	"""Número do livro citado ("2 pedro", "ii pedro" → 2), ou 0 se não houver."""
+	match = NUMERAL_INICIO.match(nome)
+	if not match:
+		return 0
+	return int(match.group(1)) if match.group(1) else len(match.group(2))
+
+
+def _numeral_livro(livro_meta: dict) -> int:
+	match = NUMERAL_LIVRO.match(livro_meta["livro"])
+	return len(match.group(1)) if match else 0
+
+
+@functools.lru_cache(maxsize=2048)
+def resolver_livro(nome: str) -> dict | None:
+	"""
+	Acha o livro pelo nome digitado: primeiro exato, depois sem acentos e
+	espaços ("Exodo", "1 corintios") e, por fim, tolerando um ou dois erros
+	de digitação ("Genesys"). Um erro que caia entre dois livros não resolve.
+	"""
+
+	nome = nome.lower().strip()
+
+	livro_meta = LIVROS_MAP.get(nome)
+
+	if livro_meta:
+		return livro_meta
+
+	chave = _chave_livro(nome)
+	livro_meta = LIVROS_DOBRADOS.get(chave)
+
+	if livro_meta or len(chave) < 5:
+		return livro_meta
+
+	limite = 1 if len(chave) < 8 else 2
+	resultados = ARVORE_LIVROS.buscar(chave, limite)
+
+	# Um erro de digitação não pode trocar o número do livro ("2 pedro" não é I São Pedro).
+	numeral = _numeral(nome)
+	if numeral:
+		resultados = [(d, p) for d, p in resultados if _numeral_livro(LIVROS_DOBRADOS[p]) == numeral]
+
+	if not resultados:
+		return None
+
+	melhor = resultados[0][0]
+	livros = {LIVROS_DOBRADOS[p]["livro"] for d, p in resultados if d == melhor}
+
+	if len(livros) != 1:
+		return None
+
+	return LIVROS_DOBRADOS[resultados[0][1]]
+
+
+PALAVRA = re.compile(r"[a-zà-ÿ]+")
+DIGITO = re.compile(r"\d")
+NUMERO = re.compile(r"\d+")
+CAPITULO_VERSICULOS = re.compile(r"^(\d+)[,:](.+)$")
+CAPITULOS = re.compile(r"^(\d+)(?:-(\d+))?$")
+CAPITULO_VERSICULO_FINAL = re.compile(r"^(\d+)[,:](\d+)")
+
+# Versículo final de quem pede capítulos inteiros ("Sl 23", "Gn 1-3").
+FIM_CAPITULO = 0xFFFF
+
+# Uma referência ocupa uma linha inteira ou um trecho entre `;`.
+REFERENCIA = re.compile(
+	r"(?:^|;)[ \t]*"
+	r"((?:[1-3][ \t]?)?"
+	r"[A-Za-zÀ-ÿ]+"
+	r"(?:[ \t]+[A-Za-zÀ-ÿ]+)*)"
+	r"[ \t]*(\d+[,:\dab\.-]*)[ \t\r]*(?=;|$)",
+	re.MULTILINE,
+)
+
+
+def _ultima_palavra(alias: str) -> str:
+	return PALAVRA.findall(alias)[-1]
+
+
+# No meio do texto, o livro precisa vir seguido de "capítulo,versículos"
+# (ou "capítulo,versículo-capítulo,versículo").
+CAPITULO_INLINE = re.compile(r"[ \t]*(\d+[,:]\d[\dab\.-]*(?:[,:]\d[\dab\.-]*)?)")
+
+# Uma palavra (talvez com número) que não é nome conhecido, seguida de
+# "capítulo,versículos": candidata a nome de livro digitado errado. Palavras com
+# menos de 5 letras nunca passam pela busca aproximada de `resolver_livro`.
+CANDIDATO_INLINE = re.compile(r"(?<!\w)((?:[1-3][ \t]?|i{1,3}[ \t])?)([^\W\d_]{5,})" + CAPITULO_INLINE.pattern)
+
+# "1 joão" sem apelido conhecido não pode virar "joão".
+NUMERAL_ANTES = re.compile(r"(?:^|[^\w])(?:[1-3]|i{1,3})[ \t]?$")
+
+# Abreviações que também são palavras, unidades ou gírias do chat ("os 2,5
+# litros", "na 1,5 hora", "tb 2,1"). No meio do texto só valem escritas como
+# abreviação mesmo: "Os 2,5", "Mt 5,3", "Êx 2,3".
+APELIDOS_AMBIGUOS = frozenset({
+	"ab", "ag", "am", "ap", "at", "cl", "ex", "is",
+	"ml", "mq", "mt", "na", "ne", "os", "pr", "tb",
+	"th", "ti",
+})
+
+# A última palavra de cada nome de livro vem logo antes do número do capítulo,
+# então uma mensagem sem nenhuma delas não tem referência no meio do texto.
+PALAVRAS_LIVROS = frozenset(_ultima_palavra(dobrar_acentos(alias)) for alias in LIVROS_MAP)
+
 
-	def limpar_versiculo(v):
-		return int(re.match(r"\d+", v).group())
+def _limpar_versiculo(v: str) -> int:
+	return int(NUMERO.match(v).group())
 
-	def parse_chapter_verses(text):
 
-		match = re.match(r"^(\d+)[,:](.+)$", text.strip())
+def _ordenar_trecho(c1: int, v1: int, c2: int, v2: int) -> tuple[int, int, int, int]:
+	if (c2, v2) < (c1, v1):
+		return c2, v2, c1, v1
+	return c1, v1, c2, v2
+
+
+def _parse_capitulo_versiculos(text: str) -> list[tuple[int, int, int, int]]:
+	"""
+	Lê "3,16-18.20", "5,1-7,29", "23" ou "1-3" como trechos
+	(capítulo, versículo, capítulo final, versículo final).
+	"""
+
+	text = text.strip()
+	match = CAPITULO_VERSICULOS.match(text)
+
+	if not match:
+		match = CAPITULOS.match(text)
 
 		if not match:
 			return []
 
-		capitulo = int(match.group(1))
+		c1 = int(match.group(1))
+		c2 = int(match.group(2) or c1)
 
-		ranges = []
+		return [(min(c1, c2), 1, max(c1, c2), FIM_CAPITULO)]
 
-		for trecho in match.group(2).split("."):
-			trecho = trecho.strip()
+	capitulo = int(match.group(1))
 
-			if not trecho:
-				continue
+	ranges = []
 
-			if "-" in trecho:
-				a, b = trecho.split("-")
+	for trecho in match.group(2).split("."):
+		trecho = trecho.strip()
 
-				v1 = limpar_versiculo(a)
-				v2 = limpar_versiculo(b)
+		if not trecho:
+			continue
 
-			else:
-				v1 = v2 = limpar_versiculo(trecho)
+		if "-" in trecho:
+			a, b = trecho.split("-", 1)
 
-			ranges.append((capitulo, v1, v2))
+			if not NUMERO.match(a):
+				continue
 
-		return ranges
+			v1 = _limpar_versiculo(a)
+			fim = CAPITULO_VERSICULO_FINAL.match(b.strip())
 
-	for bloco in content.split(";"):
-		for linha in bloco.splitlines():
-			linha = linha.strip()
+			# "5,1-7,29": o trecho termina em outro capítulo, que vale para os próximos.
+			if fim:
+				c2, v2 = int(fim.group(1)), int(fim.group(2))
+				ranges.append(_ordenar_trecho(capitulo, v1, c2, v2))
+				capitulo = c2
+				continue
 
-			if not linha:
+			if not NUMERO.match(b):
 				continue
 
-			match = re.match(pattern, linha)
+			v2 = _limpar_versiculo(b)
 
-			if not match:
+		else:
+			if not NUMERO.match(trecho):
 				continue
 
-			livro_input, cap_vers = match.groups()
+			v1 = v2 = _limpar_versiculo(trecho)
 
-			livro_meta = LIVROS_MAP.get(livro_input.lower())
+		ranges.append((capitulo, min(v1, v2), capitulo, max(v1, v2)))
 
-			if not livro_meta:
-				continue
+	return ranges
 
-			for cap, v1, v2 in parse_chapter_verses(cap_vers):
-				data.append(
-					gerar_info(biblia, livro_meta, cap, min(v1, v2), max(v1, v2))
-				)
 
-	return data
+def encontrar_referencias(content: str) -> list[tuple[dict, int, int, int, int]]:
+	"""
+	Acha as referências bíblicas da mensagem, como
+	(livro, capítulo, versículo, capítulo final, versículo final).
+	Mensagens sem dígito saem antes de qualquer regex.
+	"""
+
+	if not DIGITO.search(content):
+		return []
+
+	minusculo = content.lower()
+
+	referencias = []
+
+	for match in REFERENCIA.finditer(minusculo):
+		livro_input, cap_vers = match.groups()
+
+		livro_meta = resolver_livro(livro_input)
+
+		if not livro_meta:
+			continue
+
+		for trecho in _parse_capitulo_versiculos(cap_vers):
+			referencias.append((livro_meta, *trecho))
+
+	return referencias
+
+
+class AutomatoLivros:
+	"""
+	Aho-Corasick sobre os nomes e abreviações dos livros (`LIVROS_MAP`).
+	Acha todos os nomes que aparecem num texto numa única passada.
+	"""
+
+	def __init__(self, apelidos: dict[str, dict]):
+		self.transicoes: list[dict[str, int]] = [{}]
+		self.falha: list[int] = [0]
+		self.saidas: list[list[tuple[int, dict]]] = [[]]
+
+		for apelido, meta in apelidos.items():
+			estado = 0
+			for c in apelido:
+				proximo = self.transicoes[estado].get(c)
+				if proximo is None:
+					proximo = len(self.transicoes)
+					self.transicoes.append({})
+					self.falha.append(0)
+					self.saidas.append([])
+					self.transicoes[estado][c] = proximo
+				estado = proximo
+			self.saidas[estado].append((len(apelido), meta))
+
+		fila = deque(self.transicoes[0].values())
+		while fila:
+			estado = fila.popleft()
+			for c, proximo in self.transicoes[estado].items():
+				fila.append(proximo)
+				f = self.falha[estado]
+				while f and c not in self.transicoes[f]:
+					f = self.falha[f]
+				self.falha[proximo] = self.transicoes[f].get(c, 0)
+				self.saidas[proximo] = self.saidas[proximo] + self.saidas[self.falha[proximo]]
+
+		# O nome mais longo que termina num ponto vem primeiro ("1 joão" antes de "joão").
+		for saida in self.saidas:
+			saida.sort(key=lambda item: item[0], reverse=True)
+
+	def buscar(self, texto: str):
+		"""Gera (fim, tamanho, livro) para cada nome encontrado, em ordem de fim."""
+		transicoes = self.transicoes
+		falha = self.falha
+		estado = 0
+
+		for i, c in enumerate(texto):
+			while estado and c not in transicoes[estado]:
+				estado = falha[estado]
+			estado = transicoes[estado].get(c, 0)
+
+			for tamanho, meta in self.saidas[estado]:
+				yield i + 1, tamanho, meta
+
+
+# Sem acentos, mas com espaços, para casar com o texto dobrado posição a posição.
+AUTOMATO_LIVROS = AutomatoLivros(_montar_livros_dobrados(dobrar_acentos))
+
+
+def _linha_inteira(texto: str, inicio: int, fim: int) -> bool:
+	"""Se `texto[inicio:fim]` ocupa sozinho a sua linha (ou trecho entre `;`)."""
+	antes = max(texto.rfind("\n", 0, inicio), texto.rfind(";", 0, inicio)) + 1
+	depois = min(p for p in (texto.find("\n", fim), texto.find(";", fim), len(texto)) if p != -1)
+	return not texto[antes:inicio].strip() and not texto[fim:depois].strip()
+
+
+def encontrar_referencias_inline(content: str) -> list[tuple[dict, int, int, int, int]]:
+	"""
+	Como `encontrar_referencias`, mas acha as referências em qualquer ponto
+	da mensagem ("leia Jo 3,16 hoje"), não só em linhas inteiras. Mensagens
+	sem dígito saem antes de qualquer busca. Nomes conhecidos são achados
+	pelo autômato; o que sobrar antes de "capítulo,versículo" ainda passa por
+	`resolver_livro`, que tolera erros de digitação ("Genesys 1,1").
+	"""
+
+	if not DIGITO.search(content):
+		return []
+
+	minusculo = content.lower()
+	dobrado = minusculo.translate(TABELA_ACENTOS)
+
+	encontrados = []
+
+	if not PALAVRAS_LIVROS.isdisjoint(PALAVRA.findall(dobrado)):
+		encontrados = _referencias_automato(content, minusculo, dobrado)
+
+	for match in CANDIDATO_INLINE.finditer(minusculo):
+		inicio, fim = match.span()
+		if any(inicio < f and i < fim for i, f, _ in encontrados):
+			continue
+
+		livro_meta = resolver_livro((match.group(1) or "") + match.group(2))
+
+		if livro_meta:
+			encontrados.append((inicio, fim, [(livro_meta, *trecho) for trecho in _parse_capitulo_versiculos(match.group(3))]))
+
+	encontrados.sort(key=lambda item: item[0])
+	return [referencia for _, _, referencias in encontrados for referencia in referencias]
+
+
+def _referencias_automato(content: str, minusculo: str, dobrado: str) -> list[tuple[int, int, list]]:
+	"""Referências com nomes conhecidos, como (início, fim, referências)."""
+	encontrados = []
+	consumido = 0
+
+	for fim, tamanho, livro_meta in AUTOMATO_LIVROS.buscar(dobrado):
+		inicio = fim - tamanho
+
+		if inicio < consumido:
+			continue
+
+		if inicio > 0 and minusculo[inicio - 1].isalnum():
+			continue
+
+		if NUMERAL_ANTES.search(minusculo, max(inicio - 5, 0), inicio):
+			continue
+
+		match = CAPITULO_INLINE.match(minusculo, fim)
+
+		if not match:
+			continue
+
+		apelido = dobrado[inicio:fim]
+		if (
+			apelido in APELIDOS_AMBIGUOS
+			and content[inicio:fim] != minusculo[inicio:fim].capitalize()
+			and not _linha_inteira(minusculo, inicio, match.end())
+		):
+			continue
+
+		# O nome com acento decide quando dobrado ele é ambíguo ("jó" e "jo").
+		livro_meta = LIVROS_MAP.get(minusculo[inicio:fim], livro_meta)
+
+		encontrados.append((inicio, match.end(), [(livro_meta, *trecho) for trecho in _parse_capitulo_versiculos(match.group(1))]))
+
+		consumido = match.end()
+
+	return encontrados
+
+
+TRECHOS_MAXIMO = 512
+TRECHOS_TTL = 6 * 60 * 60
+VERSICULOS_POR_BLOCO = 36
+# Trechos maiores que isso são gerados a cada uso, sem guardar o texto.
+VERSICULOS_EM_MEMORIA = 200
+
+
+class TrechoRenderizado:
+	"""
+	Um trecho da Bíblia como faixa de ids globais de versículos, com o que as
+	mensagens montam em cima dele: título, linhas "**n.** texto", texto corrido,
+	blocos por container e o `BibleDict`. As linhas são geradas sob demanda e,
+	em trechos curtos, guardadas. Compartilhado pelo cache, então não deve ser
+	alterado.
+	"""
+
+	__slots__ = (
+		"livro_meta", "livro", "inicio", "fim",
+		"capitulo", "versiculo_inicial", "capitulo_final", "versiculo_final",
+		"titulo", "_linhas", "_info",
+	)
+
+	def __init__(self, livro_meta, livro: LivroBiblia, inicio: int, fim: int, c1: int, v1: int, c2: int, v2: int):
+		self.livro_meta = livro_meta
+		self.livro = livro
+		self.inicio = inicio
+		self.fim = fim
+		self._linhas: list[str] | None = None
+		self._info: BibleDict | None = None
+
+		capitulos_inteiros = v1 == 1 and v2 == FIM_CAPITULO
+		_, ultimo_capitulo, ultimo_versiculo = get_biblia().localizar(fim - 1)
+
+		self.capitulo = c1
+		self.versiculo_inicial = v1
+		self.capitulo_final = ultimo_capitulo if c2 != c1 else c1
+		self.versiculo_final = ultimo_versiculo if v2 == FIM_CAPITULO or c2 != c1 else v2
+
+		if capitulos_inteiros:
+			passagem = f"{c1}" if self.capitulo_final == c1 else f"{c1}-{self.capitulo_final}"
+		elif self.capitulo_final == c1:
+			versiculo = v1 if v1 == self.versiculo_final else f"{v1}-{self.versiculo_final}"
+			passagem = f"{c1},{versiculo}"
+		else:
+			passagem = f"{c1},{v1}-{self.capitulo_final},{self.versiculo_final}"
+
+		self.titulo = f"{livro_meta['livro']} {passagem} ({livro_meta['tipo']})"
+
+	def __len__(self) -> int:
+		return self.fim - self.inicio
+
+	def _gerar_linhas(self) -> Iterator[str]:
+		varios = self.capitulo_final != self.capitulo
+
+		for capitulo, versiculo, texto in self.livro.iterar(self.inicio, self.fim):
+			yield f"**{capitulo},{versiculo}.** {texto}" if varios else f"**{versiculo}.** {texto}"
+
+	def linhas(self) -> Iterator[str]:
+		if self._linhas is not None:
+			return iter(self._linhas)
+
+		if len(self) <= VERSICULOS_EM_MEMORIA:
+			self._linhas = list(self._gerar_linhas())
+			return iter(self._linhas)
+
+		return self._gerar_linhas()
+
+	def blocos(self, tamanho: int = VERSICULOS_POR_BLOCO) -> Iterator[list[str]]:
+		"""Versículos em grupos de até `tamanho`, um por container."""
+		bloco = []
+
+		for linha in self.linhas():
+			bloco.append(linha)
+
+			if len(bloco) == tamanho:
+				yield bloco
+				bloco = []
+
+		if bloco:
+			yield bloco
+
+	@property
+	def texto_unido(self) -> str:
+		return "\n".join(self.linhas())
+
+	@property
+	def info(self) -> BibleDict:
+		if self._info is not None:
+			return self._info
+
+		info: BibleDict = {
+			"testamento": self.livro_meta["testamento"],
+			"livro": self.livro_meta["livro"],
+			"capítulo": self.capitulo,
+			"versículo_inicial": self.versiculo_inicial,
+			"capítulo_final": self.capitulo_final,
+			"versículo_final": self.versiculo_final,
+			"texto": list(self.linhas()),
+			"tipo": self.livro_meta["tipo"],
+		}
+
+		if len(self) <= VERSICULOS_EM_MEMORIA:
+			self._info = info
+
+		return info
+
+
+class CacheTrechos:
+	"""LRU dos trechos renderizados, com limite de itens e validade em segundos."""
+
+	def __init__(self, maximo: int = TRECHOS_MAXIMO, ttl: float = TRECHOS_TTL):
+		self.maximo = maximo
+		self.ttl = ttl
+		self.itens: OrderedDict[tuple, tuple[float, TrechoRenderizado]] = OrderedDict()
+		self.acertos = 0
+		self.falhas = 0
+
+	def obter(self, chave: tuple) -> TrechoRenderizado | None:
+		item = self.itens.get(chave)
+
+		if item is None or item[0] < time.monotonic():
+			if item is not None:
+				del self.itens[chave]
+			self.falhas += 1
+			return None
+
+		self.itens.move_to_end(chave)
+		self.acertos += 1
+		return item[1]
+
+	def guardar(self, chave: tuple, trecho: TrechoRenderizado):
+		self.itens[chave] = (time.monotonic() + self.ttl, trecho)
+		self.itens.move_to_end(chave)
+
+		while len(self.itens) > self.maximo:
+			self.itens.popitem(last=False)
+
+	def limpar(self):
+		self.itens.clear()
+
+	def estatisticas(self) -> dict[str, int]:
+		return {"itens": len(self.itens), "acertos": self.acertos, "falhas": self.falhas}
+
+
+CACHE_TRECHOS = CacheTrechos()
+
+
+def obter_trecho(livro_meta, c1: int, v1: int, c2: int, v2: int) -> TrechoRenderizado | None:
+	chave = (livro_meta["livro"], c1, v1, c2, v2)
+	trecho = CACHE_TRECHOS.obter(chave)
+
+	if trecho is None:
+		livro = get_biblia().livro(livro_meta["livro"])
+
+		if livro is None:
+			return None
+
+		inicio, fim = livro.faixa(c1, v1, c2, v2)
+
+		if fim <= inicio:
+			return None
+
+		trecho = TrechoRenderizado(livro_meta, livro, inicio, fim, c1, v1, c2, v2)
+		CACHE_TRECHOS.guardar(chave, trecho)
+
+	return trecho
+
+
+def expandir_trechos(content: str, inline: bool = False) -> list[TrechoRenderizado]:
+
+	buscar = encontrar_referencias_inline if inline else encontrar_referencias
+
+	trechos = []
+
+	for referencia in buscar(content):
+		trecho = obter_trecho(*referencia)
+
+		if trecho:
+			trechos.append(trecho)
+
+	return trechos
+
+
+def expand_bible_verse(content: str, inline: bool = False) -> list[BibleDict]:
+	return [trecho.info for trecho in expandir_trechos(content, inline)]
 
 
 def _personalize_transcript(
@@ -488,6 +971,8 @@ class Bot(commands.Bot):
 		setup_error_manager(self)
 		print(f"Entramos como {self.user}")
 		setup_database()
+		await asyncio.to_thread(get_biblia)
+		await asyncio.to_thread(get_catecismo)
 
 		texto = "Roma Locuta, Causa Finita."
 		status = discord.Status.online
@@ -534,6 +1019,11 @@ class Bot(commands.Bot):
 		if console:
 			return await console.send(content=content, embeds=embeds, view=view)
 
+	async def close(self):
+		await super().close()
+		await flush_arquivos()
+		await fechar_database()
+
 	@property
 	def config(self) -> Config:
 		return get_config()
\ No newline at end of file
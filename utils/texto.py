@@ -0,0 +1,128 @@
+import re
+import unicodedata
+
+
+def _montar_tabela_acentos() -> dict[int, str]:
+	tabela = {}
+	for codigo in range(0xC0, 0x250):
+		decomposto = unicodedata.normalize("NFD", chr(codigo))
+		base = decomposto[0]
+		if len(decomposto) > 1 and base.isascii() and all(unicodedata.category(c) == "Mn" for c in decomposto[1:]):
+			tabela[codigo] = base
+	return tabela
+
+
+TABELA_ACENTOS = _montar_tabela_acentos()
+
+
+def dobrar_acentos(texto: str) -> str:
+	"""
+	Minúsculas e sem acentos ("Êxodo" → "exodo"). Cada caractere vira um
+	só, então as posições do texto original continuam valendo.
+	"""
+	return texto.lower().translate(TABELA_ACENTOS)
+
+
+CYRILLIC_TO_LATIN = str.maketrans({
+	"А": "A", "В": "B", "Е": "E", "К": "K", "М": "M",
+	"Н": "H", "О": "O", "Р": "P", "С": "C", "Т": "T",
+	"Х": "X", "а": "a", "е": "e", "о": "o", "р": "p",
+	"с": "c", "у": "y", "х": "x", "і": "i", "ј": "j",
+})
+
+
+def normalizar(texto: str) -> str:
+	texto = texto.lower()
+	texto = unicodedata.normalize("NFD", texto)
+	texto = "".join(c for c in texto if unicodedata.category(c) != "Mn")
+	texto = texto.translate(CYRILLIC_TO_LATIN)
+	texto = texto.replace("0", "o").replace("1", "i").replace("3", "e").replace("4", "a")
+	texto = texto.replace("5", "s").replace("7", "t")
+	texto = re.sub(r"(.)\1{2,}", r"\1", texto)
+	return texto
+
+
+def _mascaras(a: str) -> dict[str, int]:
+	mascaras = {}
+	for i, c in enumerate(a):
+		mascaras[c] = mascaras.get(c, 0) | (1 << i)
+	return mascaras
+
+
+def _distancia_bits(mascaras: dict[str, int], m: int, b: str) -> int:
+	"""Levenshtein bit a bit (Myers/Hyyrö): uma passada por `b`, com `a` já em máscaras."""
+	if m == 0:
+		return len(b)
+
+	cheio = (1 << m) - 1
+	ultimo = 1 << (m - 1)
+	vp = cheio
+	vn = 0
+	distancia = m
+
+	for c in b:
+		eq = mascaras.get(c, 0)
+		xv = eq | vn
+		xh = ((((eq & vp) + vp) & cheio) ^ vp) | eq
+		hp = vn | (~(xh | vp) & cheio)
+		hn = vp & xh
+
+		if hp & ultimo:
+			distancia += 1
+		elif hn & ultimo:
+			distancia -= 1
+
+		hp = ((hp << 1) | 1) & cheio
+		hn = (hn << 1) & cheio
+		vp = hn | (~(xv | hp) & cheio)
+		vn = hp & xv
+
+	return distancia
+
+
+class ArvoreBK:
+	"""
+	BK-tree de palavras: acha as palavras a até `limite` edições de uma busca
+	sem comparar com todas.
+	"""
+
+	def __init__(self, palavras):
+		self.raiz: tuple[str, dict] | None = None
+		for palavra in palavras:
+			self.adicionar(palavra)
+
+	def adicionar(self, palavra: str):
+		if self.raiz is None:
+			self.raiz = (palavra, {})
+			return
+
+		mascaras = _mascaras(palavra)
+		no_palavra, filhos = self.raiz
+		while True:
+			distancia = _distancia_bits(mascaras, len(palavra), no_palavra)
+			if distancia == 0:
+				return
+			if distancia not in filhos:
+				filhos[distancia] = (palavra, {})
+				return
+			no_palavra, filhos = filhos[distancia]
+
+	def buscar(self, palavra: str, limite: int) -> list[tuple[int, str]]:
+		"""Palavras a até `limite` edições, como (distância, palavra), das mais próximas às mais distantes."""
+		if self.raiz is None:
+			return []
+
+		mascaras = _mascaras(palavra)
+		resultados = []
+		pilha = [self.raiz]
+		while pilha:
+			no_palavra, filhos = pilha.pop()
+			distancia = _distancia_bits(mascaras, len(palavra), no_palavra)
+			if distancia <= limite:
+				resultados.append((distancia, no_palavra))
+			for d in range(distancia - limite, distancia + limite + 1):
+				if d in filhos:
+					pilha.append(filhos[d])
+
+		resultados.sort()
+		return resultados